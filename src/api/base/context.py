@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import json
 import time
 import uuid
 from dataclasses import dataclass, field
@@ -11,6 +10,7 @@ from sqlalchemy.orm import Session
 
 from src.core.logger import logger
 from src.models.database import ApiKey, User
+from src.utils.json_utils import JSONDecodeError, json_loads
 
 
 
@@ -50,8 +50,9 @@ class ApiRequestContext:
             raise HTTPException(status_code=400, detail="请求体不能为空")
 
         try:
-            self.json_body = json.loads(self.raw_body.decode("utf-8"))
-        except json.JSONDecodeError as exc:
+            # 直接解析原始 bytes，省去先 decode 成 str 的一次整体复制
+            self.json_body = json_loads(self.raw_body)
+        except JSONDecodeError as exc:
             logger.warning(f"解析JSON失败: {exc}")
             raise HTTPException(status_code=400, detail="请求体必须是合法的JSON") from exc
 
@@ -34,6 +34,7 @@ from fastapi import Request
 from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 
+from src.api.handlers.base.telemetry_event import TelemetryFailure, TelemetrySuccess
 from src.clients.redis_client import get_redis_client_sync
 from src.core.api_format_metadata import resolve_api_format
 from src.core.enums import APIFormat
@@ -83,71 +84,45 @@ class MessageTelemetry:
         )
         return total_cost
 
-    async def record_success(
-        self,
-        *,
-        provider: str,
-        model: str,
-        input_tokens: int,
-        output_tokens: int,
-        response_time_ms: int,
-        status_code: int,
-        request_body: Dict[str, Any],
-        request_headers: Dict[str, Any],
-        response_body: Any,
-        response_headers: Dict[str, Any],
-        cache_creation_tokens: int = 0,
-        cache_read_tokens: int = 0,
-        is_stream: bool = False,
-        provider_request_headers: Optional[Dict[str, Any]] = None,
-        # Provider 侧追踪信息（用于记录真实成本）
-        provider_id: Optional[str] = None,
-        provider_endpoint_id: Optional[str] = None,
-        provider_api_key_id: Optional[str] = None,
-        api_format: Optional[str] = None,
-        # 模型映射信息
-        target_model: Optional[str] = None,
-        # Provider 响应元数据（如 Gemini 的 modelVersion）
-        response_metadata: Optional[Dict[str, Any]] = None,
-    ) -> float:
+    async def record_success(self, event: TelemetrySuccess) -> float:
         total_cost = await self.calculate_cost(
-            provider,
-            model,
-            input_tokens=input_tokens,
-            output_tokens=output_tokens,
-            cache_creation_tokens=cache_creation_tokens,
-            cache_read_tokens=cache_read_tokens,
+            event.provider,
+            event.model,
+            input_tokens=event.input_tokens,
+            output_tokens=event.output_tokens,
+            cache_creation_tokens=event.cache_creation_tokens,
+            cache_read_tokens=event.cache_read_tokens,
         )
 
         await UsageService.record_usage(
             db=self.db,
             user=self.user,
             api_key=self.api_key,
-            provider=provider,
-            model=model,
-            input_tokens=input_tokens,
-            output_tokens=output_tokens,
-            cache_creation_input_tokens=cache_creation_tokens,
-            cache_read_input_tokens=cache_read_tokens,
+            provider=event.provider,
+            model=event.model,
+            input_tokens=event.input_tokens,
+            output_tokens=event.output_tokens,
+            cache_creation_input_tokens=event.cache_creation_tokens,
+            cache_read_input_tokens=event.cache_read_tokens,
             request_type="chat",
-            api_format=api_format,
-            is_stream=is_stream,
-            response_time_ms=response_time_ms,
-            status_code=status_code,
-            request_headers=request_headers,
-            request_body=request_body,
-            provider_request_headers=provider_request_headers or {},
-            response_headers=response_headers,
-            response_body=response_body,
+            api_format=event.api_format,
+            is_stream=event.is_stream,
+            response_time_ms=event.response_time_ms,
+            status_code=event.status_code,
+            request_headers=event.request_headers,
+            request_body=event.request_body,
+            provider_request_headers=event.provider_request_headers or {},
+            response_headers=event.response_headers,
+            response_body=event.response_body,
             request_id=self.request_id,
             # Provider 侧追踪信息（用于记录真实成本）
-            provider_id=provider_id,
-            provider_endpoint_id=provider_endpoint_id,
-            provider_api_key_id=provider_api_key_id,
+            provider_id=event.provider_id,
+            provider_endpoint_id=event.provider_endpoint_id,
+            provider_api_key_id=event.provider_api_key_id,
             # 模型映射信息
-            target_model=target_model,
+            target_model=event.target_model,
             # Provider 响应元数据
-            metadata=response_metadata,
+            metadata=event.response_metadata,
         )
 
         if self.user and self.api_key:
@@ -156,55 +131,25 @@ class MessageTelemetry:
                 user_id=self.user.id,
                 api_key_id=self.api_key.id,
                 request_id=self.request_id,
-                model=model,
-                provider=provider,
+                model=event.model,
+                provider=event.provider,
                 success=True,
                 ip_address=self.client_ip,
-                status_code=status_code,
-                input_tokens=input_tokens,
-                output_tokens=output_tokens,
+                status_code=event.status_code,
+                input_tokens=event.input_tokens,
+                output_tokens=event.output_tokens,
                 cost_usd=total_cost,
             )
 
         return total_cost
 
-    async def record_failure(
-        self,
-        *,
-        provider: str,
-        model: str,
-        response_time_ms: int,
-        status_code: int,
-        error_message: str,
-        request_body: Dict[str, Any],
-        request_headers: Dict[str, Any],
-        is_stream: bool,
-        api_format: Optional[str] = None,
-        provider_request_headers: Optional[Dict[str, Any]] = None,
-        # 预估 token 信息（来自 message_start 事件，用于中断请求的成本估算）
-        input_tokens: int = 0,
-        output_tokens: int = 0,
-        cache_creation_tokens: int = 0,
-        cache_read_tokens: int = 0,
-        response_body: Optional[Dict[str, Any]] = None,
-        # 模型映射信息
-        target_model: Optional[str] = None,
-    ) -> None:
+    async def record_failure(self, event: TelemetryFailure) -> None:
         """
         记录失败请求
 
-        注意：Provider 链路信息（provider_id, endpoint_id, key_id）不在此处记录，
-        因为 RequestCandidate 表已经记录了完整的请求链路追踪信息。
-
-        Args:
-            input_tokens: 预估输入 tokens（来自 message_start，用于中断请求的成本估算）
-            output_tokens: 预估输出 tokens（来自已收到的内容）
-            cache_creation_tokens: 缓存创建 tokens
-            cache_read_tokens: 缓存读取 tokens
-            response_body: 响应体（如果有部分响应）
-            target_model: 映射后的目标模型名（如果发生了映射）
+        预估 token 与部分响应体（如果有）用于中断请求的成本估算，见 TelemetryFailure。
         """
-        provider_name = provider or "unknown"
+        provider_name = event.provider or "unknown"
         if provider_name == "unknown":
             logger.warning(f"[Telemetry] Recording failure with unknown provider (request_id={self.request_id})")
 
@@ -213,25 +158,25 @@ class MessageTelemetry:
             user=self.user,
             api_key=self.api_key,
             provider=provider_name,
-            model=model,
-            input_tokens=input_tokens,
-            output_tokens=output_tokens,
-            cache_creation_input_tokens=cache_creation_tokens,
-            cache_read_input_tokens=cache_read_tokens,
+            model=event.model,
+            input_tokens=event.input_tokens,
+            output_tokens=event.output_tokens,
+            cache_creation_input_tokens=event.cache_creation_tokens,
+            cache_read_input_tokens=event.cache_read_tokens,
             request_type="chat",
-            api_format=api_format,
-            is_stream=is_stream,
-            response_time_ms=response_time_ms,
-            status_code=status_code,
-            error_message=error_message,
-            request_headers=request_headers,
-            request_body=request_body,
-            provider_request_headers=provider_request_headers or {},
+            api_format=event.api_format,
+            is_stream=event.is_stream,
+            response_time_ms=event.response_time_ms,
+            status_code=event.status_code,
+            error_message=event.error_message,
+            request_headers=event.request_headers,
+            request_body=event.request_body,
+            provider_request_headers=event.provider_request_headers or {},
             response_headers={},
-            response_body=response_body or {"error": error_message},
+            response_body=event.response_body or {"error": event.error_message},
             request_id=self.request_id,
             # 模型映射信息
-            target_model=target_model,
+            target_model=event.target_model,
         )
 
 
@@ -359,8 +304,12 @@ class BaseMessageHandler:
         *,
         mapped_model: Optional[str] = None,
     ) -> Dict[str, Any]:
-        """构建发送给 Provider 的请求体，替换 model 名称"""
-        payload = dict(original_body)
+        """
+        构建发送给 Provider 的请求体，替换 model 名称
+
+        故障转移时每个候选 Provider 都以同一个原始请求体调用，因此返回浅拷贝，不原地修改。
+        """
+        payload = original_body.copy()
         if mapped_model:
             payload["model"] = mapped_model
         return payload
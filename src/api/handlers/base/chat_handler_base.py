@@ -43,7 +43,7 @@ class ChatHandlerBase(_ChatHandlerBaseImpl):
         model = getattr(converted_request, "model", original_request_body.get("model", "unknown"))
         api_format = self.allowed_api_formats[0]
 
-        ctx = StreamContext(model=model, api_format=api_format)
+        ctx = self._create_stream_context(model, api_format)
 
         stream_processor = StreamProcessor(
             request_id=self.request_id,
@@ -106,7 +106,7 @@ class ChatHandlerBase(_ChatHandlerBaseImpl):
 
             background_tasks = BackgroundTasks()
             background_tasks.add_task(
-                telemetry_recorder.record_stream_stats,
+                telemetry_recorder.submit_stream_stats,
                 ctx,
                 original_headers,
                 original_request_body,
@@ -20,7 +20,7 @@ Chat Handler Base - Chat API 格式的通用基类
 """
 
 from abc import ABC, abstractmethod
-from typing import Any, AsyncGenerator, Callable, Dict, Optional
+from typing import Any, AsyncGenerator, Callable, Dict, Optional, Tuple
 
 import httpx
 from fastapi import BackgroundTasks, Request
@@ -34,7 +34,9 @@ from src.api.handlers.base.response_parser import ResponseParser
 from src.api.handlers.base.stream_context import StreamContext
 from src.api.handlers.base.stream_processor import StreamProcessor
 from src.api.handlers.base.stream_telemetry import StreamTelemetryRecorder
+from src.api.handlers.base.telemetry_event import TelemetryFailure, TelemetrySuccess
 from src.config.settings import config
+from src.core.cache_utils import SyncLRUCache
 from src.core.exceptions import (
     EmbeddedErrorException,
     ProviderAuthException,
@@ -51,7 +53,31 @@ from src.models.database import (
     User,
 )
 from src.services.provider.transport import build_provider_url
+from src.services.system.config import SystemConfigService
 
+# 流式响应体记录配置（进程内短 TTL 缓存，避免每个流式请求都同步查询 system_configs）
+_STREAM_LOG_CONFIG_CACHE = SyncLRUCache(max_size=1, ttl=30)
+
+
+def _stream_chunk_collection_config(db: Session) -> Tuple[bool, int]:
+    """
+    返回 (是否保留流式 chunk, 保留的累计大小上限)，配置变更最多延迟 30 秒生效
+
+    仅在 request_log_level=full 时保留 chunk，上限取 max_response_body_size（默认值见
+    SystemConfigService.DEFAULT_CONFIGS）。超出上限的 chunk 不再保留，因此记录时
+    truncate_body 的 _original_size 反映的是截留后的大小，而非完整响应大小。
+    """
+    cached = _STREAM_LOG_CONFIG_CACHE.get("stream_chunks")
+    if cached is None:
+        collect_chunks = SystemConfigService.should_log_body(db)
+        max_parsed_chunks_size = (
+            int(SystemConfigService.get_config(db, "max_response_body_size") or 0)
+            if collect_chunks
+            else 0
+        )
+        cached = (collect_chunks, max_parsed_chunks_size)
+        _STREAM_LOG_CONFIG_CACHE.set("stream_chunks", cached)
+    return cached
 
 
 class ChatHandlerBase(BaseMessageHandler, ABC):
@@ -271,6 +297,21 @@ class ChatHandlerBase(BaseMessageHandler, ABC):
 
     # ==================== 流式处理 ====================
 
+    def _create_stream_context(self, model: str, api_format: str) -> StreamContext:
+        """
+        创建流式上下文
+
+        仅在记录完整响应体（request_log_level=full）时保留解析后的 chunk，
+        且累计大小超过 max_response_body_size 后不再保留（记录时超出部分本就会被截断）。
+        """
+        collect_chunks, max_parsed_chunks_size = _stream_chunk_collection_config(self.db)
+        return StreamContext(
+            model=model,
+            api_format=api_format,
+            collect_chunks=collect_chunks,
+            max_parsed_chunks_size=max_parsed_chunks_size,
+        )
+
     async def process_stream(
         self,
         request: Any,
@@ -288,7 +329,7 @@ class ChatHandlerBase(BaseMessageHandler, ABC):
         api_format = self.allowed_api_formats[0]
 
         # 创建类型安全的流式上下文
-        ctx = StreamContext(model=model, api_format=api_format)
+        ctx = self._create_stream_context(model, api_format)
 
         # 创建流处理器
         stream_processor = StreamProcessor(
@@ -530,17 +571,19 @@ class ChatHandlerBase(BaseMessageHandler, ABC):
         actual_request_body = ctx.provider_request_body or original_request_body
 
         await self.telemetry.record_failure(
-            provider=ctx.provider_name or "unknown",
-            model=ctx.model,
-            response_time_ms=response_time_ms,
-            status_code=status_code,
-            error_message=str(error),
-            request_headers=original_headers,
-            request_body=actual_request_body,
-            is_stream=True,
-            api_format=ctx.api_format,
-            provider_request_headers=ctx.provider_request_headers,
-            target_model=ctx.mapped_model,
+            TelemetryFailure(
+                provider=ctx.provider_name or "unknown",
+                model=ctx.model,
+                response_time_ms=response_time_ms,
+                status_code=status_code,
+                error_message=str(error),
+                request_headers=original_headers,
+                request_body=actual_request_body,
+                is_stream=True,
+                api_format=ctx.api_format,
+                provider_request_headers=ctx.provider_request_headers,
+                target_model=ctx.mapped_model,
+            )
         )
 
     # ==================== 非流式处理 ====================
@@ -694,26 +737,28 @@ class ChatHandlerBase(BaseMessageHandler, ABC):
             actual_request_body = provider_request_body or original_request_body
 
             total_cost = await self.telemetry.record_success(
-                provider=provider_name,
-                model=model,
-                input_tokens=input_tokens,
-                output_tokens=output_tokens,
-                response_time_ms=response_time_ms,
-                status_code=status_code,
-                request_headers=original_headers,
-                request_body=actual_request_body,
-                response_headers=response_headers,
-                response_body=response_json,
-                cache_creation_tokens=cache_creation_tokens,
-                cache_read_tokens=cached_tokens,
-                is_stream=False,
-                provider_request_headers=provider_request_headers,
-                api_format=api_format,
-                provider_id=provider_id,
-                provider_endpoint_id=endpoint_id,
-                provider_api_key_id=key_id,
-                # 模型映射信息
-                target_model=mapped_model_result,
+                TelemetrySuccess(
+                    provider=provider_name,
+                    model=model,
+                    input_tokens=input_tokens,
+                    output_tokens=output_tokens,
+                    response_time_ms=response_time_ms,
+                    status_code=status_code,
+                    request_headers=original_headers,
+                    request_body=actual_request_body,
+                    response_headers=response_headers,
+                    response_body=response_json,
+                    cache_creation_tokens=cache_creation_tokens,
+                    cache_read_tokens=cached_tokens,
+                    is_stream=False,
+                    provider_request_headers=provider_request_headers,
+                    api_format=api_format,
+                    provider_id=provider_id,
+                    provider_endpoint_id=endpoint_id,
+                    provider_api_key_id=key_id,
+                    # 模型映射信息
+                    target_model=mapped_model_result,
+                )
             )
 
             logger.debug(f"{self.FORMAT_ID} 非流式响应完成")
@@ -738,18 +783,20 @@ class ChatHandlerBase(BaseMessageHandler, ABC):
             actual_request_body = provider_request_body or original_request_body
 
             await self.telemetry.record_failure(
-                provider=provider_name or "unknown",
-                model=model,
-                response_time_ms=response_time_ms,
-                status_code=status_code,
-                error_message=str(e),
-                request_headers=original_headers,
-                request_body=actual_request_body,
-                is_stream=False,
-                api_format=api_format,
-                provider_request_headers=provider_request_headers,
-                # 模型映射信息
-                target_model=mapped_model_result,
+                TelemetryFailure(
+                    provider=provider_name or "unknown",
+                    model=model,
+                    response_time_ms=response_time_ms,
+                    status_code=status_code,
+                    error_message=str(e),
+                    request_headers=original_headers,
+                    request_body=actual_request_body,
+                    is_stream=False,
+                    api_format=api_format,
+                    provider_request_headers=provider_request_headers,
+                    # 模型映射信息
+                    target_model=mapped_model_result,
+                )
             )
 
             raise
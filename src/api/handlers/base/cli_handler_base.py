@@ -28,6 +28,14 @@ from src.models.database import Provider, ProviderAPIKey, ProviderEndpoint
 from src.services.provider.transport import build_provider_url
 from src.utils.sse_parser import SSEEventParser
 
+# 标记流结束的事件类型（OpenAI Responses / Claude）
+_COMPLETION_EVENT_TYPES = frozenset({"response.completed", "message_stop"})
+
+
+def _int_or_none(value: Any) -> Optional[int]:
+    """usage 计数字段只接受 int，其余（None/字符串/浮点）视为缺失"""
+    return value if isinstance(value, int) else None
+
 
 class CliMessageHandlerBase(_CliMessageHandlerBaseImpl):
     async def _execute_stream_request(
@@ -183,10 +191,16 @@ class CliMessageHandlerBase(_CliMessageHandlerBaseImpl):
                 prefetched_chunks.append(chunk)
                 buffer += chunk
 
-                while b"\n" in buffer:
-                    line_bytes, buffer = buffer.split(b"\n", 1)
-                    line = decoder.decode(line_bytes + b"\n", False).rstrip("\n")
-                    normalized_line = line.rstrip("\r")
+                # 每行只做一次 find + 切片（而不是 `in` 检测后再 split 一遍）
+                pos = 0
+                while True:
+                    nl_pos = buffer.find(b"\n", pos)
+                    if nl_pos < 0:
+                        break
+                    # 在解码前去掉 \r，避免在 str 上再做一次 rstrip
+                    line_bytes = buffer[pos:nl_pos].rstrip(b"\r")
+                    pos = nl_pos + 1
+                    normalized_line = decoder.decode(line_bytes + b"\n", False).rstrip("\n")
                     line_count += 1
 
                     lower_line = normalized_line.lower()
@@ -244,6 +258,7 @@ class CliMessageHandlerBase(_CliMessageHandlerBaseImpl):
                     should_stop = True
                     break
 
+                buffer = buffer[pos:]
                 if should_stop or line_count >= max_prefetch_lines:
                     break
 
@@ -287,11 +302,11 @@ class CliMessageHandlerBase(_CliMessageHandlerBaseImpl):
                 self._update_usage_to_streaming(ctx.request_id)
                 streaming_status_updated = True
 
-            def _handle_line(line: str) -> Optional[bytes]:
-                normalized_line = line.rstrip("\r")
-                events = sse_parser.feed_line(normalized_line)
+            def _handle_line(line: str, raw_line: bytes) -> Optional[bytes]:
+                # 调用方已在字节层面去掉行尾 \r；raw_line 为该行原始字节（含结尾 \n）
+                events = sse_parser.feed_line(line)
 
-                if normalized_line == "":
+                if line == "":
                     for event in events:
                         self._handle_sse_event(ctx, event.get("event"), event.get("data") or "")
                     return b"\n"
@@ -313,12 +328,15 @@ class CliMessageHandlerBase(_CliMessageHandlerBaseImpl):
 
                 if needs_conversion:
                     converted_line = self._convert_sse_line(ctx, line, events)
-                    if converted_line:
-                        out = (converted_line + "\n").encode("utf-8")
-                    else:
+                    if not converted_line:
                         out = None
+                    elif converted_line is line:
+                        # 原样透传：复用原始字节，省去一次重新编码
+                        out = raw_line
+                    else:
+                        out = (converted_line + "\n").encode("utf-8")
                 else:
-                    out = (line + "\n").encode("utf-8")
+                    out = raw_line
 
                 for event in events:
                     self._handle_sse_event(ctx, event.get("event"), event.get("data") or "")
@@ -328,11 +346,16 @@ class CliMessageHandlerBase(_CliMessageHandlerBaseImpl):
             # 先处理预读的 chunks（不直接输出 raw bytes，而是按行输出以支持转换）
             for chunk in prefetched_chunks:
                 buffer += chunk
-                while b"\n" in buffer:
-                    line_bytes, buffer = buffer.split(b"\n", 1)
-                    line = decoder.decode(line_bytes + b"\n", False).rstrip("\n")
+                pos = 0
+                while True:
+                    nl_pos = buffer.find(b"\n", pos)
+                    if nl_pos < 0:
+                        break
+                    raw_line = buffer[pos:nl_pos].rstrip(b"\r") + b"\n"
+                    pos = nl_pos + 1
+                    line = decoder.decode(raw_line, False).rstrip("\n")
 
-                    out = _handle_line(line)
+                    out = _handle_line(line, raw_line)
                     if out is None:
                         continue
                     _maybe_update_streaming_status()
@@ -345,14 +368,21 @@ class CliMessageHandlerBase(_CliMessageHandlerBaseImpl):
                     if out.startswith(b"event: error"):
                         return
 
+                buffer = buffer[pos:]
+
             async for chunk in byte_iterator:
                 buffer += chunk
 
-                while b"\n" in buffer:
-                    line_bytes, buffer = buffer.split(b"\n", 1)
-                    line = decoder.decode(line_bytes + b"\n", False).rstrip("\n")
+                pos = 0
+                while True:
+                    nl_pos = buffer.find(b"\n", pos)
+                    if nl_pos < 0:
+                        break
+                    raw_line = buffer[pos:nl_pos].rstrip(b"\r") + b"\n"
+                    pos = nl_pos + 1
+                    line = decoder.decode(raw_line, False).rstrip("\n")
 
-                    out = _handle_line(line)
+                    out = _handle_line(line, raw_line)
                     if out is None:
                         continue
                     _maybe_update_streaming_status()
@@ -365,10 +395,13 @@ class CliMessageHandlerBase(_CliMessageHandlerBaseImpl):
                     if out.startswith(b"event: error"):
                         return
 
+                buffer = buffer[pos:]
+
             if buffer:
                 try:
-                    line = decoder.decode(buffer, True)
-                    out = _handle_line(line)
+                    line_bytes = buffer.rstrip(b"\r")
+                    line = decoder.decode(line_bytes, True)
+                    out = _handle_line(line, line_bytes + b"\n")
                     if out is not None:
                         _maybe_update_streaming_status()
                         _record_first_byte_time()
@@ -469,18 +502,20 @@ class CliMessageHandlerBase(_CliMessageHandlerBaseImpl):
         if usage:
             ctx.final_usage = usage
 
-            input_tokens = usage.get("input_tokens")
-            output_tokens = usage.get("output_tokens")
-            cache_read_tokens = usage.get("cache_read_tokens")
-            cache_creation_tokens = usage.get("cache_creation_tokens")
+            # 每个事件都会走到这里：绑定局部变量，减少重复的属性/方法查找
+            usage_get = usage.get
+            input_tokens = _int_or_none(usage_get("input_tokens"))
+            output_tokens = _int_or_none(usage_get("output_tokens"))
+            cache_read_tokens = _int_or_none(usage_get("cache_read_tokens"))
+            cache_creation_tokens = _int_or_none(usage_get("cache_creation_tokens"))
 
-            if isinstance(input_tokens, int) and (input_tokens > 0 or ctx.input_tokens == 0):
+            if input_tokens is not None and (input_tokens > 0 or ctx.input_tokens == 0):
                 ctx.input_tokens = input_tokens
-            if isinstance(output_tokens, int) and (output_tokens > 0 or ctx.output_tokens == 0):
+            if output_tokens is not None and (output_tokens > 0 or ctx.output_tokens == 0):
                 ctx.output_tokens = output_tokens
-            if isinstance(cache_read_tokens, int) and (cache_read_tokens > 0 or ctx.cached_tokens == 0):
+            if cache_read_tokens is not None and (cache_read_tokens > 0 or ctx.cached_tokens == 0):
                 ctx.cached_tokens = cache_read_tokens
-            if isinstance(cache_creation_tokens, int) and (
+            if cache_creation_tokens is not None and (
                 cache_creation_tokens > 0 or ctx.cache_creation_tokens == 0
             ):
                 ctx.cache_creation_tokens = cache_creation_tokens
@@ -489,7 +524,7 @@ class CliMessageHandlerBase(_CliMessageHandlerBaseImpl):
         if text:
             ctx.collected_text += text
 
-        if event_type in ("response.completed", "message_stop"):
+        if event_type in _COMPLETION_EVENT_TYPES:
             ctx.has_completion = True
             response_obj = data.get("response")
             if isinstance(response_obj, dict):
@@ -41,6 +41,7 @@ from src.api.handlers.base.response_parser import (
     ResponseParser,
     StreamStats,
 )
+from src.api.handlers.base.telemetry_event import TelemetryFailure, TelemetrySuccess
 from src.core.exceptions import (
     EmbeddedErrorException,
     ProviderAuthException,
@@ -1145,24 +1146,26 @@ class CliMessageHandlerBase(BaseMessageHandler):
                     # 记录失败的 Usage，但使用已收到的预估 token 信息（来自 message_start）
                     # 这样即使请求中断，也能记录预估成本
                     await bg_telemetry.record_failure(
-                        provider=ctx.provider_name or "unknown",
-                        model=ctx.model,
-                        response_time_ms=response_time_ms,
-                        status_code=ctx.status_code,
-                        error_message=ctx.error_message or f"HTTP {ctx.status_code}",
-                        request_headers=original_headers,
-                        request_body=actual_request_body,
-                        is_stream=True,
-                        api_format=ctx.api_format,
-                        provider_request_headers=ctx.provider_request_headers,
-                        # 预估 token 信息（来自 message_start 事件）
-                        input_tokens=actual_input_tokens,
-                        output_tokens=ctx.output_tokens,
-                        cache_creation_tokens=ctx.cache_creation_tokens,
-                        cache_read_tokens=ctx.cached_tokens,
-                        response_body=response_body,
-                        # 模型映射信息
-                        target_model=ctx.mapped_model,
+                        TelemetryFailure(
+                            provider=ctx.provider_name or "unknown",
+                            model=ctx.model,
+                            response_time_ms=response_time_ms,
+                            status_code=ctx.status_code,
+                            error_message=ctx.error_message or f"HTTP {ctx.status_code}",
+                            request_headers=original_headers,
+                            request_body=actual_request_body,
+                            is_stream=True,
+                            api_format=ctx.api_format,
+                            provider_request_headers=ctx.provider_request_headers,
+                            # 预估 token 信息（来自 message_start 事件）
+                            input_tokens=actual_input_tokens,
+                            output_tokens=ctx.output_tokens,
+                            cache_creation_tokens=ctx.cache_creation_tokens,
+                            cache_read_tokens=ctx.cached_tokens,
+                            response_body=response_body,
+                            # 模型映射信息
+                            target_model=ctx.mapped_model,
+                        )
                     )
                     logger.debug(f"{self.FORMAT_ID} 流式响应中断")
                     # 简洁的请求失败摘要（包含预估 token 信息）
@@ -1173,29 +1176,33 @@ class CliMessageHandlerBase(BaseMessageHandler):
                     self._finalize_stream_metadata(ctx)
 
                     total_cost = await bg_telemetry.record_success(
-                        provider=ctx.provider_name,
-                        model=ctx.model,
-                        input_tokens=actual_input_tokens,
-                        output_tokens=ctx.output_tokens,
-                        response_time_ms=response_time_ms,
-                        status_code=ctx.status_code,
-                        request_headers=original_headers,
-                        request_body=actual_request_body,
-                        response_headers=ctx.response_headers,
-                        response_body=response_body,
-                        cache_creation_tokens=ctx.cache_creation_tokens,
-                        cache_read_tokens=ctx.cached_tokens,
-                        is_stream=True,
-                        provider_request_headers=ctx.provider_request_headers,
-                        api_format=ctx.api_format,
-                        # Provider 侧追踪信息（用于记录真实成本）
-                        provider_id=ctx.provider_id,
-                        provider_endpoint_id=ctx.endpoint_id,
-                        provider_api_key_id=ctx.key_id,
-                        # 模型映射信息
-                        target_model=ctx.mapped_model,
-                        # Provider 响应元数据（如 Gemini 的 modelVersion）
-                        response_metadata=ctx.response_metadata if ctx.response_metadata else None,
+                        TelemetrySuccess(
+                            provider=ctx.provider_name,
+                            model=ctx.model,
+                            input_tokens=actual_input_tokens,
+                            output_tokens=ctx.output_tokens,
+                            response_time_ms=response_time_ms,
+                            status_code=ctx.status_code,
+                            request_headers=original_headers,
+                            request_body=actual_request_body,
+                            response_headers=ctx.response_headers,
+                            response_body=response_body,
+                            cache_creation_tokens=ctx.cache_creation_tokens,
+                            cache_read_tokens=ctx.cached_tokens,
+                            is_stream=True,
+                            provider_request_headers=ctx.provider_request_headers,
+                            api_format=ctx.api_format,
+                            # Provider 侧追踪信息（用于记录真实成本）
+                            provider_id=ctx.provider_id,
+                            provider_endpoint_id=ctx.endpoint_id,
+                            provider_api_key_id=ctx.key_id,
+                            # 模型映射信息
+                            target_model=ctx.mapped_model,
+                            # Provider 响应元数据（如 Gemini 的 modelVersion）
+                            response_metadata=(
+                                ctx.response_metadata if ctx.response_metadata else None
+                            ),
+                        )
                     )
                     logger.debug(f"{self.FORMAT_ID} 流式响应完成")
                     # 简洁的请求完成摘要
@@ -1269,18 +1276,20 @@ class CliMessageHandlerBase(BaseMessageHandler):
         actual_request_body = ctx.provider_request_body or original_request_body
 
         await self.telemetry.record_failure(
-            provider=ctx.provider_name or "unknown",
-            model=ctx.model,
-            response_time_ms=response_time_ms,
-            status_code=status_code,
-            error_message=str(error),
-            request_headers=original_headers,
-            request_body=actual_request_body,
-            is_stream=True,
-            api_format=ctx.api_format,
-            provider_request_headers=ctx.provider_request_headers,
-            # 模型映射信息
-            target_model=ctx.mapped_model,
+            TelemetryFailure(
+                provider=ctx.provider_name or "unknown",
+                model=ctx.model,
+                response_time_ms=response_time_ms,
+                status_code=status_code,
+                error_message=str(error),
+                request_headers=original_headers,
+                request_body=actual_request_body,
+                is_stream=True,
+                api_format=ctx.api_format,
+                provider_request_headers=ctx.provider_request_headers,
+                # 模型映射信息
+                target_model=ctx.mapped_model,
+            )
         )
 
     # _update_usage_to_streaming 方法已移至基类 BaseMessageHandler
@@ -1490,29 +1499,33 @@ class CliMessageHandlerBase(BaseMessageHandler):
             actual_request_body = provider_request_body or original_request_body
 
             total_cost = await self.telemetry.record_success(
-                provider=provider_name,
-                model=model,
-                input_tokens=actual_input_tokens,
-                output_tokens=output_tokens,
-                response_time_ms=response_time_ms,
-                status_code=status_code,
-                request_headers=original_headers,
-                request_body=actual_request_body,
-                response_headers=response_headers,
-                response_body=response_json,
-                cache_creation_tokens=cache_creation_tokens,
-                cache_read_tokens=cached_tokens,
-                is_stream=False,
-                provider_request_headers=provider_request_headers,
-                api_format=api_format,
-                # Provider 侧追踪信息（用于记录真实成本）
-                provider_id=provider_id,
-                provider_endpoint_id=endpoint_id,
-                provider_api_key_id=key_id,
-                # 模型映射信息
-                target_model=mapped_model_result,
-                # Provider 响应元数据（如 Gemini 的 modelVersion）
-                response_metadata=response_metadata_result if response_metadata_result else None,
+                TelemetrySuccess(
+                    provider=provider_name,
+                    model=model,
+                    input_tokens=actual_input_tokens,
+                    output_tokens=output_tokens,
+                    response_time_ms=response_time_ms,
+                    status_code=status_code,
+                    request_headers=original_headers,
+                    request_body=actual_request_body,
+                    response_headers=response_headers,
+                    response_body=response_json,
+                    cache_creation_tokens=cache_creation_tokens,
+                    cache_read_tokens=cached_tokens,
+                    is_stream=False,
+                    provider_request_headers=provider_request_headers,
+                    api_format=api_format,
+                    # Provider 侧追踪信息（用于记录真实成本）
+                    provider_id=provider_id,
+                    provider_endpoint_id=endpoint_id,
+                    provider_api_key_id=key_id,
+                    # 模型映射信息
+                    target_model=mapped_model_result,
+                    # Provider 响应元数据（如 Gemini 的 modelVersion）
+                    response_metadata=(
+                        response_metadata_result if response_metadata_result else None
+                    ),
+                )
             )
 
             logger.info(f"{self.FORMAT_ID} 非流式响应处理完成")
@@ -1534,18 +1547,20 @@ class CliMessageHandlerBase(BaseMessageHandler):
             actual_request_body = provider_request_body or original_request_body
 
             await self.telemetry.record_failure(
-                provider=provider_name or "unknown",
-                model=model,
-                response_time_ms=response_time_ms,
-                status_code=status_code,
-                error_message=str(e),
-                request_headers=original_headers,
-                request_body=actual_request_body,
-                is_stream=False,
-                api_format=api_format,
-                provider_request_headers=provider_request_headers,
-                # 模型映射信息
-                target_model=mapped_model_result,
+                TelemetryFailure(
+                    provider=provider_name or "unknown",
+                    model=model,
+                    response_time_ms=response_time_ms,
+                    status_code=status_code,
+                    error_message=str(e),
+                    request_headers=original_headers,
+                    request_body=actual_request_body,
+                    is_stream=False,
+                    api_format=api_format,
+                    provider_request_headers=provider_request_headers,
+                    # 模型映射信息
+                    target_model=mapped_model_result,
+                )
             )
 
             raise
@@ -1598,16 +1613,15 @@ class CliMessageHandlerBase(BaseMessageHandler):
             events: 解析后的事件列表
 
         Returns:
-            转换后的 SSE 行，如果无法转换则返回 None
+            - None: 该行不输出
+            - 原 line 对象本身: 原样透传（调用方可直接复用原始字节）
+            - 新字符串: 转换后的 SSE 行
         """
         from src.api.handlers.base.format_converter_registry import converter_registry
 
-        # 如果是空行或特殊控制行，直接返回
-        if not line or line.strip() == "" or line == "data: [DONE]":
-            return line
-
-        # 如果不是 data 行，直接透传
-        if not line.startswith("data:"):
+        # 空行/纯空白行、非 data 行以及 [DONE] 都不以 "data:" 开头或无需转换，直接透传
+        # （不必为判断空行而 strip() 整行）
+        if not line.startswith("data:") or line == "data: [DONE]":
             return line
 
         # 提取 data 内容
@@ -5,7 +5,9 @@
 不再经过 Protocol 抽象层。
 """
 
-from typing import Any, Dict, Optional, Tuple
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
 
 from src.api.handlers.base.response_parser import (
     ParsedChunk,
@@ -57,21 +59,72 @@ def _check_nested_error(response: Dict[str, Any]) -> Tuple[bool, Optional[Dict[s
     return False, None
 
 
-def _safe_int(value: Any) -> Optional[int]:
-    if value is None:
+def _sse_data_payload(line: str) -> Optional[str]:
+    """
+    取出 SSE 行的数据部分（去掉 "data: " 前缀），空行/纯空白行返回 None
+
+    只有首字符是空白时才需要 strip() 判断，避免每行都多做一次拷贝。
+    """
+    if not line or (line[0].isspace() and not line.strip()):
         return None
-    if isinstance(value, bool):
-        return int(value)
-    if isinstance(value, int):
-        return value
-    if isinstance(value, float):
+    return line[6:] if line.startswith("data: ") else line
+
+
+def _join_claude_text(content: Any) -> str:
+    """拼接 Claude content[] 中所有 text 块的文本"""
+    if not isinstance(content, list):
+        return ""
+    return "".join(
+        text
+        for block in content
+        if isinstance(block, dict) and block.get("type") == "text" and (text := block.get("text"))
+    )
+
+
+def _join_gemini_text(response: Dict[str, Any]) -> str:
+    """拼接 Gemini 第一个候选 parts[] 中的文本"""
+    candidates = response.get("candidates")
+    if not candidates:
+        return ""
+    parts = candidates[0].get("content", {}).get("parts", [])
+    return "".join(part["text"] for part in parts if "text" in part)
+
+
+def _str_to_int(value: str) -> Optional[int]:
+    try:
         return int(value)
-    if isinstance(value, str):
-        try:
-            return int(value)
-        except ValueError:
-            return None
-    return None
+    except ValueError:
+        return None
+
+
+# 按值的具体类型分派到转换函数，替代逐个 isinstance 判断（JSON 解析结果只会是这些精确类型）
+_INT_COERCERS: Dict[type, Callable[[Any], Optional[int]]] = {
+    int: lambda value: value,
+    bool: int,
+    float: int,
+    str: _str_to_int,
+}
+
+
+def _safe_int(value: Any) -> Optional[int]:
+    coerce = _INT_COERCERS.get(type(value))
+    return coerce(value) if coerce is not None else None
+
+
+# 共享的只读空 usage，避免每次调用都创建 {}
+_EMPTY_USAGE: Mapping[str, Any] = MappingProxyType({})
+
+
+def _extract_claude_usage(response: Dict[str, Any]) -> Dict[str, int]:
+    """提取 Claude usage 并映射为统一字段名"""
+    usage = response.get("usage") or _EMPTY_USAGE
+    usage_get = usage.get
+    return {
+        "input_tokens": usage_get("input_tokens", 0),
+        "output_tokens": usage_get("output_tokens", 0),
+        "cache_creation_tokens": usage_get("cache_creation_input_tokens", 0),
+        "cache_read_tokens": usage_get("cache_read_input_tokens", 0),
+    }
 
 
 def _extract_openai_usage_dict(response: Dict[str, Any]) -> Optional[Dict[str, Any]]:
@@ -91,6 +144,8 @@ def _extract_openai_usage_dict(response: Dict[str, Any]) -> Optional[Dict[str, A
 class OpenAIResponseParser(ResponseParser):
     """OpenAI 格式响应解析器"""
 
+    __slots__ = ("_parser", "name", "api_format")
+
     def __init__(self):
         from src.api.handlers.openai.stream_parser import OpenAIStreamParser
 
@@ -99,14 +154,10 @@ class OpenAIResponseParser(ResponseParser):
         self.api_format = "OPENAI"
 
     def parse_sse_line(self, line: str, stats: StreamStats) -> Optional[ParsedChunk]:
-        if not line or not line.strip():
+        data_str = _sse_data_payload(line)
+        if data_str is None:
             return None
 
-        if line.startswith("data: "):
-            data_str = line[6:]
-        else:
-            data_str = line
-
         parsed = self._parser.parse_line(data_str)
         if parsed is None:
             return None
@@ -117,19 +168,32 @@ class OpenAIResponseParser(ResponseParser):
             data=parsed,
         )
 
+        # 每个 token 都会走到这里：只取一次 choices[0]，
+        # 合并 extract_text_delta 与 is_done_chunk 的查找
+        text_delta = None
+        is_done = bool(parsed.get("__done__"))
+        choices = parsed.get("choices")
+        if choices:
+            choice = choices[0]
+            delta = choice.get("delta")
+            if delta:
+                content = delta.get("content")
+                if isinstance(content, str):
+                    text_delta = content
+            if choice.get("finish_reason") is not None:
+                is_done = True
+
         # 提取文本增量
-        text_delta = self._parser.extract_text_delta(parsed)
         if text_delta:
             chunk.text_delta = text_delta
-            stats.collected_text += text_delta
+            stats.append_text(text_delta)
 
         # 检查是否结束
-        if self._parser.is_done_chunk(parsed):
+        if is_done:
             chunk.is_done = True
             stats.has_completion = True
 
         stats.chunk_count += 1
-        stats.data_count += 1
 
         return chunk
 
@@ -171,23 +235,25 @@ class OpenAIResponseParser(ResponseParser):
         if not usage:
             return {}
 
+        usage_get = usage.get
+
         # Chat Completions: prompt_tokens / completion_tokens
-        input_tokens = _safe_int(usage.get("prompt_tokens"))
-        output_tokens = _safe_int(usage.get("completion_tokens"))
+        input_tokens = _safe_int(usage_get("prompt_tokens"))
+        output_tokens = _safe_int(usage_get("completion_tokens"))
 
         # Responses API: input_tokens / output_tokens
         if input_tokens is None:
-            input_tokens = _safe_int(usage.get("input_tokens"))
+            input_tokens = _safe_int(usage_get("input_tokens"))
         if output_tokens is None:
-            output_tokens = _safe_int(usage.get("output_tokens"))
+            output_tokens = _safe_int(usage_get("output_tokens"))
 
-        cache_read_tokens = _safe_int(usage.get("cache_read_tokens"))
-        cache_creation_tokens = _safe_int(usage.get("cache_creation_tokens"))
+        cache_read_tokens = _safe_int(usage_get("cache_read_tokens"))
+        cache_creation_tokens = _safe_int(usage_get("cache_creation_tokens"))
 
         if cache_read_tokens is None:
-            cache_read_tokens = _safe_int(usage.get("cached_tokens"))
+            cache_read_tokens = _safe_int(usage_get("cached_tokens"))
 
-        input_details = usage.get("input_tokens_details")
+        input_details = usage_get("input_tokens_details")
         if isinstance(input_details, dict):
             if cache_read_tokens is None:
                 cache_read_tokens = _safe_int(input_details.get("cached_tokens"))
@@ -233,79 +299,94 @@ class OpenAIResponseParser(ResponseParser):
 class OpenAICliResponseParser(OpenAIResponseParser):
     """OpenAI CLI 格式响应解析器"""
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__()
         self.name = "OPENAI_CLI"
         self.api_format = "OPENAI_CLI"
 
 
-class ClaudeResponseParser(ResponseParser):
-    """Claude 格式响应解析器"""
+class _StreamEventResponseParser(ResponseParser):
+    """
+    Claude / Gemini 共用的 parse_sse_line 实现
 
-    def __init__(self):
-        from src.api.handlers.claude.stream_parser import ClaudeStreamParser
+    两种格式的流式解析流程一致，差异只在事件类型和 usage 字段名，
+    由子类通过类属性描述，而不是各自复制一份解析流程。
+    """
 
-        self._parser = ClaudeStreamParser()
-        self.name = "CLAUDE"
-        self.api_format = "CLAUDE"
+    __slots__ = ("_parser", "name", "api_format")
+
+    # 固定的事件类型；为 None 时由 stream parser 从事件中读取
+    _STREAM_EVENT_TYPE: Optional[str] = None
+    # (ParsedChunk/StreamStats 字段名, stream parser usage 字段名)
+    _STREAM_USAGE_FIELDS: Tuple[Tuple[str, str], ...] = ()
 
     def parse_sse_line(self, line: str, stats: StreamStats) -> Optional[ParsedChunk]:
-        if not line or not line.strip():
+        data_str = _sse_data_payload(line)
+        if data_str is None:
             return None
 
-        if line.startswith("data: "):
-            data_str = line[6:]
-        else:
-            data_str = line
-
-        parsed = self._parser.parse_line(data_str)
+        parser = self._parser
+        parsed = parser.parse_line(data_str)
         if parsed is None:
             return None
 
+        event_type = self._STREAM_EVENT_TYPE
         chunk = ParsedChunk(
             raw_line=line,
-            event_type=self._parser.get_event_type(parsed),
+            event_type=event_type if event_type is not None else parser.get_event_type(parsed),
             data=parsed,
         )
 
         # 提取文本增量
-        text_delta = self._parser.extract_text_delta(parsed)
+        text_delta = parser.extract_text_delta(parsed)
         if text_delta:
             chunk.text_delta = text_delta
-            stats.collected_text += text_delta
+            stats.append_text(text_delta)
 
         # 检查是否结束
-        if self._parser.is_done_event(parsed):
+        if parser.is_done_event(parsed):
             chunk.is_done = True
             stats.has_completion = True
 
         # 提取 usage
-        usage = self._parser.extract_usage(parsed)
+        usage = parser.extract_usage(parsed)
         if usage:
-            chunk.input_tokens = usage.get("input_tokens", 0)
-            chunk.output_tokens = usage.get("output_tokens", 0)
-            chunk.cache_creation_tokens = usage.get("cache_creation_tokens", 0)
-            chunk.cache_read_tokens = usage.get("cache_read_tokens", 0)
-
-            stats.input_tokens = chunk.input_tokens
-            stats.output_tokens = chunk.output_tokens
-            stats.cache_creation_tokens = chunk.cache_creation_tokens
-            stats.cache_read_tokens = chunk.cache_read_tokens
+            for field_name, usage_key in self._STREAM_USAGE_FIELDS:
+                value = usage.get(usage_key, 0)
+                setattr(chunk, field_name, value)
+                setattr(stats, field_name, value)
 
         # 检查错误
-        if self._parser.is_error_event(parsed):
+        if parser.is_error_event(parsed):
             chunk.is_error = True
-            error = parsed.get("error", {})
-            if isinstance(error, dict):
-                chunk.error_message = error.get("message", str(error))
-            else:
-                chunk.error_message = str(error)
+            chunk.error_message = self._extract_error_message(parsed)
 
         stats.chunk_count += 1
-        stats.data_count += 1
 
         return chunk
 
+
+class ClaudeResponseParser(_StreamEventResponseParser):
+    """Claude 格式响应解析器"""
+
+    __slots__ = ()
+
+    _STREAM_USAGE_FIELDS = (
+        ("input_tokens", "input_tokens"),
+        ("output_tokens", "output_tokens"),
+        ("cache_creation_tokens", "cache_creation_tokens"),
+        ("cache_read_tokens", "cache_read_tokens"),
+    )
+
+    def __init__(self):
+        from src.api.handlers.claude.stream_parser import ClaudeStreamParser
+
+        self._parser = ClaudeStreamParser()
+        self.name = "CLAUDE"
+        self.api_format = "CLAUDE"
+
     def parse_response(self, response: Dict[str, Any], status_code: int) -> ParsedResponse:
         result = ParsedResponse(
             raw_response=response,
@@ -313,22 +394,16 @@ class ClaudeResponseParser(ResponseParser):
         )
 
         # 提取文本内容
-        content = response.get("content", [])
-        if isinstance(content, list):
-            text_parts = []
-            for block in content:
-                if isinstance(block, dict) and block.get("type") == "text":
-                    text_parts.append(block.get("text", ""))
-            result.text_content = "".join(text_parts)
+        result.text_content = _join_claude_text(response.get("content"))
 
         result.response_id = response.get("id")
 
         # 提取 usage
-        usage = response.get("usage", {})
-        result.input_tokens = usage.get("input_tokens", 0)
-        result.output_tokens = usage.get("output_tokens", 0)
-        result.cache_creation_tokens = usage.get("cache_creation_input_tokens", 0)
-        result.cache_read_tokens = usage.get("cache_read_input_tokens", 0)
+        usage = _extract_claude_usage(response)
+        result.input_tokens = usage["input_tokens"]
+        result.output_tokens = usage["output_tokens"]
+        result.cache_creation_tokens = usage["cache_creation_tokens"]
+        result.cache_read_tokens = usage["cache_read_tokens"]
 
         # 检查错误（支持嵌套错误格式）
         is_error, error_info = _check_nested_error(response)
@@ -340,23 +415,10 @@ class ClaudeResponseParser(ResponseParser):
         return result
 
     def extract_usage_from_response(self, response: Dict[str, Any]) -> Dict[str, int]:
-        usage = response.get("usage", {})
-        return {
-            "input_tokens": usage.get("input_tokens", 0),
-            "output_tokens": usage.get("output_tokens", 0),
-            "cache_creation_tokens": usage.get("cache_creation_input_tokens", 0),
-            "cache_read_tokens": usage.get("cache_read_input_tokens", 0),
-        }
+        return _extract_claude_usage(response)
 
     def extract_text_content(self, response: Dict[str, Any]) -> str:
-        content = response.get("content", [])
-        if isinstance(content, list):
-            text_parts = []
-            for block in content:
-                if isinstance(block, dict) and block.get("type") == "text":
-                    text_parts.append(block.get("text", ""))
-            return "".join(text_parts)
-        return ""
+        return _join_claude_text(response.get("content"))
 
     def is_error_response(self, response: Dict[str, Any]) -> bool:
         is_error, _ = _check_nested_error(response)
@@ -366,15 +428,27 @@ class ClaudeResponseParser(ResponseParser):
 class ClaudeCliResponseParser(ClaudeResponseParser):
     """Claude CLI 格式响应解析器"""
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__()
         self.name = "CLAUDE_CLI"
         self.api_format = "CLAUDE_CLI"
 
 
-class GeminiResponseParser(ResponseParser):
+class GeminiResponseParser(_StreamEventResponseParser):
     """Gemini 格式响应解析器"""
 
+    __slots__ = ()
+
+    # Gemini 的流式响应使用 SSE 格式 (data: {...})，没有 event 行
+    _STREAM_EVENT_TYPE = "content"
+    _STREAM_USAGE_FIELDS = (
+        ("input_tokens", "input_tokens"),
+        ("output_tokens", "output_tokens"),
+        ("cache_read_tokens", "cached_tokens"),
+    )
+
     def __init__(self):
         from src.api.handlers.gemini.stream_parser import GeminiStreamParser
 
@@ -382,67 +456,6 @@ class GeminiResponseParser(ResponseParser):
         self.name = "GEMINI"
         self.api_format = "GEMINI"
 
-    def parse_sse_line(self, line: str, stats: StreamStats) -> Optional[ParsedChunk]:
-        """
-        解析 Gemini SSE 行
-
-        Gemini 的流式响应使用 SSE 格式 (data: {...})
-        """
-        if not line or not line.strip():
-            return None
-
-        # Gemini SSE 格式: data: {...}
-        if line.startswith("data: "):
-            data_str = line[6:]
-        else:
-            data_str = line
-
-        parsed = self._parser.parse_line(data_str)
-        if parsed is None:
-            return None
-
-        chunk = ParsedChunk(
-            raw_line=line,
-            event_type="content",
-            data=parsed,
-        )
-
-        # 提取文本增量
-        text_delta = self._parser.extract_text_delta(parsed)
-        if text_delta:
-            chunk.text_delta = text_delta
-            stats.collected_text += text_delta
-
-        # 检查是否结束
-        if self._parser.is_done_event(parsed):
-            chunk.is_done = True
-            stats.has_completion = True
-
-        # 提取 usage
-        usage = self._parser.extract_usage(parsed)
-        if usage:
-            chunk.input_tokens = usage.get("input_tokens", 0)
-            chunk.output_tokens = usage.get("output_tokens", 0)
-            chunk.cache_read_tokens = usage.get("cached_tokens", 0)
-
-            stats.input_tokens = chunk.input_tokens
-            stats.output_tokens = chunk.output_tokens
-            stats.cache_read_tokens = chunk.cache_read_tokens
-
-        # 检查错误
-        if self._parser.is_error_event(parsed):
-            chunk.is_error = True
-            error = parsed.get("error", {})
-            if isinstance(error, dict):
-                chunk.error_message = error.get("message", str(error))
-            else:
-                chunk.error_message = str(error)
-
-        stats.chunk_count += 1
-        stats.data_count += 1
-
-        return chunk
-
     def parse_response(self, response: Dict[str, Any], status_code: int) -> ParsedResponse:
         result = ParsedResponse(
             raw_response=response,
@@ -450,15 +463,7 @@ class GeminiResponseParser(ResponseParser):
         )
 
         # 提取文本内容
-        candidates = response.get("candidates", [])
-        if candidates:
-            content = candidates[0].get("content", {})
-            parts = content.get("parts", [])
-            text_parts = []
-            for part in parts:
-                if "text" in part:
-                    text_parts.append(part["text"])
-            result.text_content = "".join(text_parts)
+        result.text_content = _join_gemini_text(response)
 
         result.response_id = response.get("modelVersion")
 
@@ -501,16 +506,7 @@ class GeminiResponseParser(ResponseParser):
         }
 
     def extract_text_content(self, response: Dict[str, Any]) -> str:
-        candidates = response.get("candidates", [])
-        if candidates:
-            content = candidates[0].get("content", {})
-            parts = content.get("parts", [])
-            text_parts = []
-            for part in parts:
-                if "text" in part:
-                    text_parts.append(part["text"])
-            return "".join(text_parts)
-        return ""
+        return _join_gemini_text(response)
 
     def is_error_response(self, response: Dict[str, Any]) -> bool:
         """
@@ -524,6 +520,8 @@ class GeminiResponseParser(ResponseParser):
 class GeminiCliResponseParser(GeminiResponseParser):
     """Gemini CLI 格式响应解析器"""
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__()
         self.name = "GEMINI_CLI"
@@ -541,15 +539,23 @@ _PARSERS = {
 }
 
 
+@lru_cache(maxsize=16)
+def _get_cached_parser(format_id: str) -> ResponseParser:
+    return _PARSERS[format_id]()
+
+
 def get_parser_for_format(format_id: str) -> ResponseParser:
     """
     根据格式 ID 获取 ResponseParser
 
+    解析器不持有请求级状态（统计写入调用方传入的 StreamStats），
+    因此每种格式只创建一个实例，在所有请求间共享。
+
     Args:
         format_id: 格式 ID，如 "CLAUDE", "OPENAI", "CLAUDE_CLI", "OPENAI_CLI"
 
     Returns:
-        ResponseParser 实例
+        ResponseParser 实例（共享，调用方不要修改其属性）
 
     Raises:
         KeyError: 格式不存在
@@ -557,7 +563,18 @@ def get_parser_for_format(format_id: str) -> ResponseParser:
     format_id = format_id.upper()
     if format_id not in _PARSERS:
         raise KeyError(f"Unknown format: {format_id}")
-    return _PARSERS[format_id]()
+    return _get_cached_parser(format_id)
+
+
+def warm_parsers() -> None:
+    """
+    预先创建所有格式的共享解析器
+
+    各解析器在 __init__ 中延迟导入对应的 stream parser（避免与 handler 包循环导入），
+    启动时调用一次，首个请求就不必承担导入与实例化开销。
+    """
+    for format_id in _PARSERS:
+        _get_cached_parser(format_id)
 
 
 def is_cli_format(format_id: str) -> bool:
@@ -573,6 +590,6 @@ __all__ = [
     "GeminiResponseParser",
     "GeminiCliResponseParser",
     "get_parser_for_format",
-    "get_parser_from_protocol",
     "is_cli_format",
+    "warm_parsers",
 ]
@@ -16,7 +16,7 @@ from __future__ import annotations
 from abc import ABC, abstractmethod
 from typing import Any, Dict, FrozenSet, Optional, Tuple
 
-from src.core.crypto import crypto_service
+from src.services.provider.transport import build_auth_headers
 
 # ==============================================================================
 # 统一的头部配置常量
@@ -138,28 +138,12 @@ class PassthroughRequestBuilder(RequestBuilder):
         """
         透传请求头 - 清理敏感头部（黑名单），透传其他所有头部
         """
-        from src.core.api_format_metadata import get_auth_config, resolve_api_format
-
-        headers: Dict[str, str] = {}
-
-        # 1. 根据 API 格式自动设置认证头
-        decrypted_key = crypto_service.decrypt(key.api_key)
-        api_format = getattr(endpoint, "api_format", None)
-        resolved_format = resolve_api_format(api_format)
-        auth_header, auth_type = (
-            get_auth_config(resolved_format) if resolved_format else ("Authorization", "bearer")
-        )
-
-        if auth_type == "bearer":
-            headers[auth_header] = f"Bearer {decrypted_key}"
-        else:
-            headers[auth_header] = decrypted_key
-
-        # 2. 添加 endpoint 配置的额外头部
-        if endpoint.headers:
-            headers.update(endpoint.headers)
+        # 1-2. 根据 API 格式自动设置认证头，并添加 endpoint 配置的额外头部
+        headers = build_auth_headers(endpoint, key)
 
         # 3. 透传原始头部（排除敏感头部 - 黑名单模式）
+        # 每个头部名只做一次 lower()，顺便记录客户端是否带了 Content-Type
+        has_content_type = False
         if original_headers:
             for name, value in original_headers.items():
                 lower_name = name.lower()
@@ -168,14 +152,16 @@ class PassthroughRequestBuilder(RequestBuilder):
                 if lower_name in SENSITIVE_HEADERS:
                     continue
 
+                if lower_name == "content-type":
+                    has_content_type = True
                 headers[name] = value
 
         # 4. 添加额外头部
         if extra_headers:
             headers.update(extra_headers)
 
-        # 5. 确保有 Content-Type
-        if "Content-Type" not in headers and "content-type" not in headers:
+        # 5. 确保有 Content-Type（客户端已提供时无需再查找）
+        if not has_content_type and "Content-Type" not in headers and "content-type" not in headers:
             headers["Content-Type"] = "application/json"
 
         return headers
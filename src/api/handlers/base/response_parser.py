@@ -2,12 +2,17 @@
 响应解析器基类 - 定义统一的响应解析接口
 """
 
+import sys
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import Any, Dict, Optional
+from io import StringIO
+from typing import Any, Dict, Iterable, List, Optional
 
+# 流式热路径上的数据类使用 __slots__（dataclass(slots=True) 需要 Python 3.10+，旧版本退化为普通 dataclass）
+DATACLASS_SLOTS: Dict[str, Any] = {"slots": True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+
+@dataclass(**DATACLASS_SLOTS)
 class ParsedChunk:
     """解析后的流式数据块"""
 
@@ -32,13 +37,12 @@ class ParsedChunk:
     response_id: Optional[str] = None
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class StreamStats:
     """流式响应统计信息"""
 
-    # 计数
+    # 计数（解析器只在成功解析出数据块时计数，data_count 与之恒等，见下方属性）
     chunk_count: int = 0
-    data_count: int = 0
 
     # Token 使用量
     input_tokens: int = 0
@@ -46,8 +50,8 @@ class StreamStats:
     cache_creation_tokens: int = 0
     cache_read_tokens: int = 0
 
-    # 内容
-    collected_text: str = ""
+    # 内容（文本增量写入 StringIO，读取时才拼接）
+    _text_buf: StringIO = field(default_factory=StringIO, repr=False)
     response_id: Optional[str] = None
 
     # 状态
@@ -64,8 +68,23 @@ class StreamStats:
     response_headers: Dict[str, str] = field(default_factory=dict)
     final_response: Optional[Dict[str, Any]] = None
 
+    @property
+    def data_count(self) -> int:
+        """数据块数量（与 chunk_count 相同，保留以兼容旧调用方）"""
+        return self.chunk_count
+
+    @property
+    def collected_text(self) -> str:
+        """已收集的文本内容"""
+        return self._text_buf.getvalue()
+
+    def append_text(self, text: str) -> None:
+        """追加文本增量（均摊 O(1)，不受字符串引用计数影响）"""
+        if text:
+            self._text_buf.write(text)
 
-@dataclass
+
+@dataclass(**DATACLASS_SLOTS)
 class ParsedResponse:
     """解析后的非流式响应"""
 
@@ -97,6 +116,9 @@ class ResponseParser(ABC):
     子类需要实现具体的解析逻辑。
     """
 
+    # 解析器只持有少量固定属性，子类用 __slots__ 声明，避免实例 __dict__
+    __slots__ = ()
+
     # 解析器名称（用于日志）
     name: str = "base"
 
@@ -117,6 +139,28 @@ class ResponseParser(ABC):
         """
         pass
 
+    def parse_sse_lines(self, lines: Iterable[str], stats: StreamStats) -> List[ParsedChunk]:
+        """
+        批量解析多行 SSE 数据
+
+        一次网络读取通常包含多行，批量接口省去调用方逐行的方法查找开销。
+        子类可覆盖以实现更高效的批量解析。
+
+        Args:
+            lines: SSE 行数据（已去除行尾换行符）
+            stats: 流统计对象（会被更新）
+
+        Returns:
+            包含有效数据的数据块列表
+        """
+        parse_line = self.parse_sse_line
+        chunks: List[ParsedChunk] = []
+        for line in lines:
+            chunk = parse_line(line, stats)
+            if chunk is not None:
+                chunks.append(chunk)
+        return chunks
+
     @abstractmethod
     def parse_response(self, response: Dict[str, Any], status_code: int) -> ParsedResponse:
         """
@@ -169,6 +213,20 @@ class ResponseParser(ABC):
         """
         return "error" in response
 
+    @staticmethod
+    def _extract_error_message(data: Dict[str, Any]) -> Optional[str]:
+        """
+        提取顶层 error 字段中的错误消息
+
+        非错误路径上不创建临时的空 dict；error 缺失时返回 None。
+        """
+        error = data.get("error")
+        if error is None:
+            return None
+        if isinstance(error, dict):
+            return error.get("message", str(error))
+        return str(error)
+
     def create_stats(self) -> StreamStats:
         """创建新的流统计对象"""
         return StreamStats()
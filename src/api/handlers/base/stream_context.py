@@ -12,8 +12,11 @@ import time
 from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional
 
+from src.api.handlers.base.response_parser import DATACLASS_SLOTS, ResponseParser
+from src.api.handlers.base.telemetry_event import TelemetryFailure, TelemetrySuccess
 
-@dataclass
+
+@dataclass(**DATACLASS_SLOTS)
 class StreamContext:
     """
     流式处理上下文
@@ -39,6 +42,8 @@ class StreamContext:
     attempt_id: Optional[str] = None
     attempt_synced: bool = False
     provider_api_format: Optional[str] = None  # Provider 的响应格式
+    # 按 provider_api_format 解析出的响应解析器（一次流中不变，由 StreamProcessor 缓存）
+    parser: Optional[ResponseParser] = field(default=None, repr=False)
 
     # 模型映射
     mapped_model: Optional[str] = None
@@ -79,6 +84,11 @@ class StreamContext:
     data_count: int = 0
     chunk_count: int = 0
     parsed_chunks: List[Dict[str, Any]] = field(default_factory=list)
+    # 仅在需要记录完整响应体（request_log_level=full）时才保留解析后的 chunk
+    collect_chunks: bool = False
+    # 保留 chunk 的累计大小上限（按原始 JSON 文本长度计，0 表示不限）
+    max_parsed_chunks_size: int = 0
+    parsed_chunks_size: int = 0
 
     def reset_for_retry(self) -> None:
         """
@@ -88,6 +98,8 @@ class StreamContext:
         保留 model 和 api_format，重置其他所有状态。
         """
         self.parsed_chunks = []
+        self.parsed_chunks_size = 0
+        self.parser = None
         self.chunk_count = 0
         self.data_count = 0
         self.has_completion = False
@@ -121,6 +133,19 @@ class StreamContext:
         self.endpoint_id = endpoint_id
         self.key_id = key_id
         self.provider_api_format = provider_api_format
+        self.parser = None
+
+    def add_parsed_chunk(self, data: Dict[str, Any], size: int) -> None:
+        """
+        保留一个解析后的 chunk（size 为其原始 JSON 文本长度）
+
+        Usage 记录响应体时按序列化后的前缀截断，而 json.dumps 的结果通常不短于 Provider
+        返回的紧凑 JSON，所以累计大小达到上限后的 chunk 会落在截断点之后，无需再保留。
+        """
+        if self.max_parsed_chunks_size and self.parsed_chunks_size >= self.max_parsed_chunks_size:
+            return
+        self.parsed_chunks.append(data)
+        self.parsed_chunks_size += size
 
     @property
     def collected_text(self) -> str:
@@ -180,7 +205,7 @@ class StreamContext:
             "chunks": self.parsed_chunks,
             "metadata": {
                 "stream": True,
-                "total_chunks": len(self.parsed_chunks),
+                "total_chunks": self.data_count,
                 "data_count": self.data_count,
                 "has_completion": self.has_completion,
                 "response_time_ms": response_time_ms,
@@ -188,6 +213,70 @@ class StreamContext:
             },
         }
 
+    def build_telemetry_success(
+        self,
+        *,
+        request_headers: Dict[str, Any],
+        request_body: Dict[str, Any],
+        response_body: Dict[str, Any],
+        response_time_ms: int,
+    ) -> TelemetrySuccess:
+        """从上下文构建成功请求的遥测事件"""
+        return TelemetrySuccess(
+            provider=self.provider_name or "unknown",
+            model=self.model,
+            input_tokens=self.input_tokens,
+            output_tokens=self.output_tokens,
+            response_time_ms=response_time_ms,
+            status_code=self.status_code,
+            request_body=request_body,
+            request_headers=request_headers,
+            response_body=response_body,
+            response_headers=self.response_headers,
+            cache_creation_tokens=self.cache_creation_tokens,
+            cache_read_tokens=self.cached_tokens,
+            is_stream=True,
+            provider_request_headers=self.provider_request_headers,
+            api_format=self.api_format,
+            provider_id=self.provider_id,
+            provider_endpoint_id=self.endpoint_id,
+            provider_api_key_id=self.key_id,
+            target_model=self.mapped_model,
+            response_metadata=self.response_metadata or None,
+        )
+
+    def build_telemetry_failure(
+        self,
+        *,
+        request_headers: Dict[str, Any],
+        request_body: Dict[str, Any],
+        response_body: Optional[Dict[str, Any]] = None,
+        response_time_ms: int,
+    ) -> TelemetryFailure:
+        """
+        从上下文构建失败请求的遥测事件
+
+        已收到的 token 信息一并记录，用于中断请求的成本估算。
+        """
+        return TelemetryFailure(
+            provider=self.provider_name or "unknown",
+            model=self.model,
+            response_time_ms=response_time_ms,
+            status_code=self.status_code,
+            error_message=self.error_message or f"HTTP {self.status_code}",
+            request_body=request_body,
+            request_headers=request_headers,
+            is_stream=True,
+            api_format=self.api_format,
+            provider_request_headers=self.provider_request_headers,
+            input_tokens=self.input_tokens,
+            output_tokens=self.output_tokens,
+            cache_creation_tokens=self.cache_creation_tokens,
+            cache_read_tokens=self.cached_tokens,
+            response_body=response_body,
+            target_model=self.mapped_model,
+        )
+
     def get_log_summary(self, request_id: str, response_time_ms: int) -> str:
         """
         获取日志摘要
@@ -9,10 +9,9 @@
 """
 
 import asyncio
-import codecs
 import json
-import time
-from typing import Any, AsyncGenerator, Callable, Optional
+import re
+from typing import Any, AsyncGenerator, Callable, Dict, List, Optional
 
 import httpx
 
@@ -22,8 +21,77 @@ from src.api.handlers.base.stream_context import StreamContext
 from src.core.exceptions import EmbeddedErrorException
 from src.core.logger import logger
 from src.models.database import Provider, ProviderEndpoint
+from src.utils.json_utils import JSONDecodeError, json_loads
 from src.utils.sse_parser import SSEEventParser
 
+# 客户端断连检测的轮询间隔（秒）
+_DISCONNECT_CHECK_INTERVAL_S = 0.25
+
+# 标记流结束的事件类型
+_COMPLETION_EVENT_TYPES = frozenset({"response.completed", "message_stop"})
+
+# SSE 行标记（字节形式，在解码前直接比较）
+_SSE_DATA_PREFIX = b"data: "
+_SSE_DONE = b"[DONE]"
+_SSE_COMMENT_PREFIX = b":"
+
+# 只统计 usage / 完成状态时，不含这些子串的事件无需 JSON 解析
+# （"usage" 同时覆盖 Gemini 的 usageMetadata）
+_COMPLETION_MARKERS = ("message_stop", "response.completed")
+_USAGE_MARKER = "usage"
+
+# Gemini 每个 chunk 都在顶层携带 usageMetadata；只需要 usage 时只解析这个子对象。
+# 字符串内容里的引号必然被转义，因此该模式只会命中真正的 JSON 键
+_GEMINI_USAGE_KEY_RE = re.compile(r'"usageMetadata"\s*:\s*')
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _scan_gemini_usage(data_str: str) -> Optional[Dict[str, Any]]:
+    """
+    从 Gemini 事件文本中只解析 usageMetadata 子对象
+
+    Returns:
+        {"usageMetadata": {...}}；找不到或解析失败时返回 None（调用方回退到完整解析）
+    """
+    match = _GEMINI_USAGE_KEY_RE.search(data_str)
+    if match is None:
+        return None
+    try:
+        usage_metadata, _ = _JSON_DECODER.raw_decode(data_str, match.end())
+    except ValueError:
+        return None
+    if not isinstance(usage_metadata, dict):
+        return None
+    return {"usageMetadata": usage_metadata}
+
+
+def _split_complete_lines(buffer: bytearray, chunk: bytes) -> List[bytes]:
+    """
+    把 chunk 追加到 buffer，取出其中所有完整的行（不含换行符）
+
+    buffer 保存上一个 chunk 末尾不完整的行（不含换行符），取出后清空，
+    本 chunk 末尾不完整的部分再存回 buffer。
+
+    切行由一次 bytes.split 在 C 层完成，而不是在 Python 中逐行 find；
+    常见情况下 chunk 边界与行边界对齐（buffer 为空），转发给客户端的 chunk
+    无需整体复制进 buffer。超长单行（如 base64 图片）跨多个 chunk 时整体仍是 O(n)。
+    """
+    lines = chunk.split(b"\n")
+    tail = lines.pop()
+
+    if buffer:
+        if not lines:
+            # 本 chunk 内仍没有换行，继续累积
+            buffer.extend(tail)
+            return lines
+        buffer.extend(lines[0])
+        lines[0] = bytes(buffer)
+        buffer.clear()
+
+    if tail:
+        buffer.extend(tail)
+    return lines
+
 
 class StreamProcessor:
     """
@@ -46,13 +114,22 @@ class StreamProcessor:
         self.collect_text = collect_text
 
     def get_parser_for_provider(self, ctx: StreamContext) -> ResponseParser:
-        """根据 Provider 的 api_format 选择对应的解析器"""
-        if ctx.provider_api_format:
-            try:
-                return get_parser_for_format(ctx.provider_api_format)
-            except KeyError:
-                pass
-        return self.default_parser
+        """
+        根据 Provider 的 api_format 选择对应的解析器
+
+        结果缓存在 ctx.parser 上：同一次流中 Provider 不变，每个 SSE 事件都无需重新查找；
+        故障转移切换 Provider 时由 reset_for_retry/update_provider_info 清除。
+        """
+        parser = ctx.parser
+        if parser is None:
+            parser = self.default_parser
+            if ctx.provider_api_format:
+                try:
+                    parser = get_parser_for_format(ctx.provider_api_format)
+                except KeyError:
+                    pass
+            ctx.parser = parser
+        return parser
 
     def handle_sse_event(
         self,
@@ -68,9 +145,27 @@ class StreamProcessor:
             ctx.has_completion = True
             return
 
+        # 不收集文本/原始 chunk 时，只有携带 usage 或完成标记的事件才值得解析；
+        # 其余（绝大多数文本增量事件）直接跳过，不计入 data_count（只统计实际解析的事件）
+        if (
+            not self.collect_text
+            and not ctx.collect_chunks
+            and event_name not in _COMPLETION_EVENT_TYPES
+            and not any(marker in data_str for marker in _COMPLETION_MARKERS)
+        ):
+            if _USAGE_MARKER not in data_str:
+                return
+
+            # 只需要 usage：Gemini 事件只解析 usageMetadata 子对象，不构建整个事件字典
+            usage_only = _scan_gemini_usage(data_str)
+            if usage_only is not None:
+                ctx.data_count += 1
+                self._apply_usage(ctx, self.get_parser_for_provider(ctx), usage_only)
+                return
+
         try:
-            data = json.loads(data_str)
-        except json.JSONDecodeError:
+            data = json_loads(data_str)
+        except JSONDecodeError:
             return
 
         ctx.data_count += 1
@@ -78,18 +173,12 @@ class StreamProcessor:
         if not isinstance(data, dict):
             return
 
-        ctx.parsed_chunks.append(data)
+        if ctx.collect_chunks:
+            ctx.add_parsed_chunk(data, len(data_str))
 
         parser = self.get_parser_for_provider(ctx)
 
-        usage = parser.extract_usage_from_response(data)
-        if usage:
-            ctx.update_usage(
-                input_tokens=usage.get("input_tokens"),
-                output_tokens=usage.get("output_tokens"),
-                cached_tokens=usage.get("cache_read_tokens"),
-                cache_creation_tokens=usage.get("cache_creation_tokens"),
-            )
+        self._apply_usage(ctx, parser, data)
 
         if self.collect_text:
             text = parser.extract_text_content(data)
@@ -97,9 +186,21 @@ class StreamProcessor:
                 ctx.append_text(text)
 
         event_type = event_name or data.get("type", "")
-        if event_type in ("response.completed", "message_stop"):
+        if event_type in _COMPLETION_EVENT_TYPES:
             ctx.has_completion = True
 
+    @staticmethod
+    def _apply_usage(ctx: StreamContext, parser: ResponseParser, data: Dict[str, Any]) -> None:
+        """从事件中提取 usage 并更新到上下文"""
+        usage = parser.extract_usage_from_response(data)
+        if usage:
+            ctx.update_usage(
+                input_tokens=usage.get("input_tokens"),
+                output_tokens=usage.get("output_tokens"),
+                cached_tokens=usage.get("cache_read_tokens"),
+                cache_creation_tokens=usage.get("cache_creation_tokens"),
+            )
+
     async def prefetch_and_check_error(
         self,
         byte_iterator: Any,
@@ -116,43 +217,35 @@ class StreamProcessor:
         """
         prefetched_chunks: list = []
         parser = self.get_parser_for_provider(ctx)
-        buffer = b""
+        buffer = bytearray()
         line_count = 0
         should_stop = False
-        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
 
         try:
             async for chunk in byte_iterator:
                 prefetched_chunks.append(chunk)
-                buffer += chunk
-
-                while b"\n" in buffer:
-                    line_bytes, buffer = buffer.split(b"\n", 1)
-                    try:
-                        line = decoder.decode(line_bytes + b"\n", False).rstrip("\r\n")
-                    except Exception as e:
-                        logger.warning(
-                            f"[{self.request_id}] 预读时 UTF-8 解码失败: {e}, bytes={line_bytes[:50]!r}"
-                        )
-                        continue
 
+                # 全程在字节层面处理：JSON 解析直接接受 bytes，无需先解码成 str
+                for line_bytes in _split_complete_lines(buffer, chunk):
+                    line = line_bytes.rstrip(b"\r")
                     line_count += 1
 
                     # 跳过空行和注释行
-                    if not line or line.startswith(":"):
+                    if not line or line.startswith(_SSE_COMMENT_PREFIX):
                         if line_count >= max_prefetch_lines:
                             should_stop = True
                             break
                         continue
 
-                    data_str = line[6:] if line.startswith("data: ") else line
-                    if data_str == "[DONE]":
+                    payload = line[6:] if line.startswith(_SSE_DATA_PREFIX) else line
+                    if payload == _SSE_DONE:
                         should_stop = True
                         break
 
                     try:
-                        data = json.loads(data_str)
-                    except json.JSONDecodeError:
+                        data = json_loads(payload)
+                    except ValueError:
+                        # JSONDecodeError，或 bytes 不是合法 UTF-8 时的 UnicodeDecodeError
                         if line_count >= max_prefetch_lines:
                             should_stop = True
                             break
@@ -207,64 +300,41 @@ class StreamProcessor:
         """
         try:
             sse_parser = SSEEventParser()
-            streaming_started = False
-            buffer = b""
-            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
-
-            if prefetched_chunks:
-                if not streaming_started and self.on_streaming_start:
-                    self.on_streaming_start()
-                    streaming_started = True
-
-                for chunk in prefetched_chunks:
-                    if start_time is not None:
-                        ctx.record_first_byte_time(start_time)
-                        start_time = None
-
-                    yield chunk
+            buffer = bytearray()
 
-                    buffer += chunk
-                    while b"\n" in buffer:
-                        line_bytes, buffer = buffer.split(b"\n", 1)
-                        try:
-                            line = decoder.decode(line_bytes + b"\n", False)
-                            self._process_line(ctx, sse_parser, line)
-                        except Exception as e:
-                            logger.warning(
-                                f"[{self.request_id}] UTF-8 解码失败: {e}, bytes={line_bytes[:50]!r}"
-                            )
-                            continue
+            # 首个 chunk 单独处理（触发 streaming 状态、记录 TTFB），
+            # 之后的转发循环里不再有逐 chunk 的一次性判断
+            prefetched_iter = iter(prefetched_chunks or ())
+            first_chunk = next(prefetched_iter, None)
+            if first_chunk is None:
+                try:
+                    first_chunk = await byte_iterator.__anext__()
+                except StopAsyncIteration:
+                    pass
 
-            async for chunk in byte_iterator:
-                if not streaming_started and self.on_streaming_start:
+            if first_chunk is not None:
+                if self.on_streaming_start:
                     self.on_streaming_start()
-                    streaming_started = True
-
                 if start_time is not None:
                     ctx.record_first_byte_time(start_time)
-                    start_time = None
 
-                yield chunk
+                yield first_chunk
+                self._process_chunk(ctx, sse_parser, buffer, first_chunk)
 
-                buffer += chunk
-                while b"\n" in buffer:
-                    line_bytes, buffer = buffer.split(b"\n", 1)
-                    try:
-                        line = decoder.decode(line_bytes + b"\n", False)
-                        self._process_line(ctx, sse_parser, line)
-                    except Exception as e:
-                        logger.warning(
-                            f"[{self.request_id}] UTF-8 解码失败: {e}, bytes={line_bytes[:50]!r}"
-                        )
-                        continue
+                for chunk in prefetched_iter:
+                    yield chunk
+                    self._process_chunk(ctx, sse_parser, buffer, chunk)
+
+                async for chunk in byte_iterator:
+                    yield chunk
+                    self._process_chunk(ctx, sse_parser, buffer, chunk)
 
             if buffer:
                 try:
-                    line = decoder.decode(buffer, True)
-                    self._process_line(ctx, sse_parser, line)
+                    self._process_line_bytes(ctx, sse_parser, bytes(buffer))
                 except Exception as e:
                     logger.warning(
-                        f"[{self.request_id}] 处理剩余缓冲区失败: {e}, bytes={buffer[:50]!r}"
+                        f"[{self.request_id}] 处理剩余缓冲区失败: {e}, bytes={bytes(buffer[:50])!r}"
                     )
 
             for event in sse_parser.flush():
@@ -273,30 +343,60 @@ class StreamProcessor:
         except GeneratorExit:
             raise
         finally:
-            await self._cleanup(response_ctx, http_client)
+            # shield：消费方在此处被取消时，连接仍会被完整关闭
+            await asyncio.shield(self._cleanup(response_ctx, http_client))
 
-    def _process_line(
+    def _process_chunk(
         self,
         ctx: StreamContext,
         sse_parser: SSEEventParser,
-        line: str,
+        buffer: bytearray,
+        chunk: bytes,
+    ) -> None:
+        """按行切分 chunk 并逐行处理（不完整的行留在 buffer 中）"""
+        for line_bytes in _split_complete_lines(buffer, chunk):
+            try:
+                self._process_line_bytes(ctx, sse_parser, line_bytes)
+            except Exception as e:
+                logger.warning(
+                    f"[{self.request_id}] 处理 SSE 行失败: {e}, bytes={line_bytes[:50]!r}"
+                )
+
+    def _process_line_bytes(
+        self,
+        ctx: StreamContext,
+        sse_parser: SSEEventParser,
+        line_bytes: bytes,
     ) -> None:
         """
-        处理单行数据
+        处理单行字节数据（不含 "\\n"）
 
-        SSEEventParser 以“去掉换行符”的单行文本作为输入；这里统一剔除 CR/LF，
-        避免把空行误判成 "\\n" 并导致事件边界解析错误。
+        SSE 的行边界都是 ASCII，按 b"\\n" 切出的每一行都是完整的 UTF-8 序列，
+        因此在字节层面去掉 "\\r" 后直接解码，不需要增量解码器。
         """
-        normalized_line = line.rstrip("\r\n")
+        line_bytes = line_bytes.rstrip(b"\r")
+
+        # 注释行（如 ": ping" 心跳）SSEEventParser 会直接忽略，这里在解码前就跳过，只计数
+        # （SSEEventParser 不把 "::" 开头的行当作注释，保持一致）
+        if line_bytes.startswith(_SSE_COMMENT_PREFIX) and not line_bytes.startswith(b"::"):
+            ctx.chunk_count += 1
+            return
+
+        self._feed_line(ctx, sse_parser, line_bytes.decode("utf-8", errors="replace"))
+
+    def _feed_line(
+        self,
+        ctx: StreamContext,
+        sse_parser: SSEEventParser,
+        normalized_line: str,
+    ) -> None:
+        """把已去掉换行符的行交给 SSEEventParser，并处理产出的事件"""
         events = sse_parser.feed_line(normalized_line)
 
-        if normalized_line == "":
-            for event in events:
-                self.handle_sse_event(ctx, event.get("event"), event.get("data") or "")
-        else:
+        if normalized_line:
             ctx.chunk_count += 1
-            for event in events:
-                self.handle_sse_event(ctx, event.get("event"), event.get("data") or "")
+        for event in events:
+            self.handle_sse_event(ctx, event.get("event"), event.get("data") or "")
 
     async def create_monitored_stream(
         self,
@@ -306,22 +406,42 @@ class StreamProcessor:
     ) -> AsyncGenerator[bytes, None]:
         """
         创建带监控的流生成器：检测客户端断开连接并更新状态码
+
+        断连检测由独立的后台任务按固定间隔轮询，转发循环只检查一个 Event，
+        不必在每个 chunk 上取时间或 await。检查放在 yield 返回之后、
+        读取下一个上游 chunk 之前，客户端断开后不再多读上游数据；
+        退出时立即关闭上游生成器，而不是等待垃圾回收才释放连接。
+        断连检测本身出错时同样终止转发，错误按 500 记录，不让流在无监控状态下继续。
         """
-        try:
-            # 断连检查节流：避免每个 chunk 都 await 带来的调度开销
-            next_disconnect_check_at = 0.0
-            disconnect_check_interval_s = 0.25
+        disconnected = asyncio.Event()
+        watch_error: Optional[Exception] = None
 
-            async for chunk in stream_generator:
-                now = time.monotonic()
-                if now >= next_disconnect_check_at:
-                    next_disconnect_check_at = now + disconnect_check_interval_s
+        async def watch_disconnect() -> None:
+            nonlocal watch_error
+            try:
+                while True:
+                    await asyncio.sleep(_DISCONNECT_CHECK_INTERVAL_S)
                     if await is_disconnected():
-                        logger.warning(f"ID:{self.request_id} | Client disconnected")
-                        ctx.status_code = 499
-                        ctx.error_message = "client_disconnected"
-                        break
+                        disconnected.set()
+                        return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"ID:{self.request_id} | 断连检测失败: {e}")
+                watch_error = e
+                disconnected.set()
+
+        watcher = asyncio.create_task(watch_disconnect())
+        try:
+            async for chunk in stream_generator:
                 yield chunk
+                if disconnected.is_set():
+                    if watch_error is not None:
+                        raise watch_error
+                    logger.warning(f"ID:{self.request_id} | Client disconnected")
+                    ctx.status_code = 499
+                    ctx.error_message = "client_disconnected"
+                    break
         except asyncio.CancelledError:
             ctx.status_code = 499
             ctx.error_message = "client_disconnected"
@@ -330,6 +450,9 @@ class StreamProcessor:
             ctx.status_code = 500
             ctx.error_message = str(e)
             raise
+        finally:
+            watcher.cancel()
+            await stream_generator.aclose()
 
     async def _cleanup(
         self,
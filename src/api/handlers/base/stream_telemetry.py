@@ -5,19 +5,21 @@
 1. 记录流式请求的成功/失败统计
 2. 更新 Usage 状态
 3. 更新候选记录状态（RequestCandidate）
+4. 通过后台队列异步写入，不占用响应协程
 """
 
 import asyncio
 import time
-from typing import Any, Dict, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 
+from sqlalchemy import true
 from sqlalchemy.orm import Session
 
 from src.api.handlers.base.base_handler import MessageTelemetry
 from src.api.handlers.base.stream_context import StreamContext
 from src.config.settings import config
 from src.core.logger import logger
-from src.database import get_db
+from src.database import create_session
 from src.models.database import ApiKey, User
 
 
@@ -54,26 +56,84 @@ class StreamTelemetryRecorder:
 
         注意：response_time_ms 基于 start_time 计算，避免把统计延迟（stream_stats_delay）算进响应耗时。
         """
-        bg_db: Optional[Session] = None
-
         # 在统计延迟前先计算耗时，避免把 sleep 算进 response_time_ms
         response_time_ms = int((time.time() - start_time) * 1000)
 
+        await self._record_stream_stats(
+            ctx,
+            original_headers,
+            original_request_body,
+            response_time_ms,
+            config.stream_stats_delay,
+        )
+
+    async def submit_stream_stats(
+        self,
+        ctx: StreamContext,
+        original_headers: Dict[str, str],
+        original_request_body: Dict[str, Any],
+        start_time: float,
+    ) -> None:
+        """
+        把流式统计记录交给后台遥测队列
+
+        耗时与统计延迟的截止时间都在提交时确定，排队等待不会算进 response_time_ms；
+        队列未启动或已满时退回到直接记录。
+        """
+        response_time_ms = int((time.time() - start_time) * 1000)
+        due_at = time.monotonic() + config.stream_stats_delay
+
+        async def job() -> None:
+            await self._record_stream_stats(
+                ctx,
+                original_headers,
+                original_request_body,
+                response_time_ms,
+                max(0.0, due_at - time.monotonic()),
+            )
+
+        if not get_stream_telemetry_queue().submit(job):
+            await self._record_stream_stats(
+                ctx,
+                original_headers,
+                original_request_body,
+                response_time_ms,
+                config.stream_stats_delay,
+            )
+
+    async def _record_stream_stats(
+        self,
+        ctx: StreamContext,
+        original_headers: Dict[str, str],
+        original_request_body: Dict[str, Any],
+        response_time_ms: int,
+        delay: float,
+    ) -> None:
+        bg_db: Optional[Session] = None
+
         try:
-            await asyncio.sleep(config.stream_stats_delay)
+            await asyncio.sleep(delay)
+
+            # 整个记录过程（包括出错时的状态更新）只使用这一个会话
+            bg_db = create_session()
 
             if not ctx.provider_name:
                 await self._update_usage_status_on_error(
                     response_time_ms=response_time_ms,
                     error_message="Provider name not available",
+                    db=bg_db,
                 )
                 return
 
-            db_gen = get_db()
-            bg_db = next(db_gen)
-
-            user = bg_db.query(User).filter(User.id == self.user_id).first()
-            api_key_obj = bg_db.query(ApiKey).filter(ApiKey.id == self.api_key_id).first()
+            # 一次查询同时取回 User 和 ApiKey（任一不存在时结果为 None）；
+            # 两者按各自主键过滤，join 条件用 true() 仅为避免笛卡尔积告警
+            row = (
+                bg_db.query(User, ApiKey)
+                .join(ApiKey, true())
+                .filter(User.id == self.user_id, ApiKey.id == self.api_key_id)
+                .first()
+            )
+            user, api_key_obj = row if row else (None, None)
 
             if not user or not api_key_obj:
                 logger.warning(
@@ -118,6 +178,7 @@ class StreamTelemetryRecorder:
             await self._update_usage_status_on_error(
                 response_time_ms=response_time_ms,
                 error_message=f"记录统计信息失败: {str(e)[:200]}",
+                db=bg_db,
             )
         finally:
             if bg_db:
@@ -133,26 +194,12 @@ class StreamTelemetryRecorder:
         response_time_ms: int,
     ) -> None:
         await telemetry.record_success(
-            provider=ctx.provider_name or "unknown",
-            model=ctx.model,
-            input_tokens=ctx.input_tokens,
-            output_tokens=ctx.output_tokens,
-            response_time_ms=response_time_ms,
-            status_code=ctx.status_code,
-            request_headers=original_headers,
-            request_body=actual_request_body,
-            response_headers=ctx.response_headers,
-            response_body=response_body,
-            cache_creation_tokens=ctx.cache_creation_tokens,
-            cache_read_tokens=ctx.cached_tokens,
-            is_stream=True,
-            provider_request_headers=ctx.provider_request_headers,
-            api_format=ctx.api_format,
-            provider_id=ctx.provider_id,
-            provider_endpoint_id=ctx.endpoint_id,
-            provider_api_key_id=ctx.key_id,
-            target_model=ctx.mapped_model,
-            response_metadata=ctx.response_metadata or None,
+            ctx.build_telemetry_success(
+                request_headers=original_headers,
+                request_body=actual_request_body,
+                response_body=response_body,
+                response_time_ms=response_time_ms,
+            )
         )
 
         logger.debug(f"{self.format_id} 流式响应完成")
@@ -168,22 +215,12 @@ class StreamTelemetryRecorder:
         response_time_ms: int,
     ) -> None:
         await telemetry.record_failure(
-            provider=ctx.provider_name or "unknown",
-            model=ctx.model,
-            response_time_ms=response_time_ms,
-            status_code=ctx.status_code,
-            error_message=ctx.error_message or f"HTTP {ctx.status_code}",
-            request_headers=original_headers,
-            request_body=actual_request_body,
-            is_stream=True,
-            api_format=ctx.api_format,
-            provider_request_headers=ctx.provider_request_headers,
-            input_tokens=ctx.input_tokens,
-            output_tokens=ctx.output_tokens,
-            cache_creation_tokens=ctx.cache_creation_tokens,
-            cache_read_tokens=ctx.cached_tokens,
-            response_body=response_body,
-            target_model=ctx.mapped_model,
+            ctx.build_telemetry_failure(
+                request_headers=original_headers,
+                request_body=actual_request_body,
+                response_body=response_body,
+                response_time_ms=response_time_ms,
+            )
         )
 
         logger.debug(f"{self.format_id} 流式响应中断")
@@ -231,22 +268,31 @@ class StreamTelemetryRecorder:
         self,
         response_time_ms: int,
         error_message: str,
+        db: Optional[Session] = None,
     ) -> None:
+        """
+        将 Usage 标记为失败
+
+        传入 db 时复用调用方的会话（先回滚其中可能失败的事务），否则临时创建一个。
+        """
+        owns_db = db is None
         try:
-            db_gen = get_db()
-            error_db = next(db_gen)
-            try:
-                await self._update_usage_status_directly(
-                    error_db,
-                    status="failed",
-                    response_time_ms=response_time_ms,
-                    status_code=500,
-                    error_message=error_message,
-                )
-            finally:
-                error_db.close()
+            if db is None:
+                db = create_session()
+            else:
+                db.rollback()
+            await self._update_usage_status_directly(
+                db,
+                status="failed",
+                response_time_ms=response_time_ms,
+                status_code=500,
+                error_message=error_message,
+            )
         except Exception as inner_e:
             logger.error(f"[{self.request_id}] 更新 Usage 状态失败: {inner_e}")
+        finally:
+            if owns_db and db is not None:
+                db.close()
 
     async def _update_usage_status_directly(
         self,
@@ -274,3 +320,92 @@ class StreamTelemetryRecorder:
             logger.debug(f"[{self.request_id}] Usage 状态已更新: {status}")
         except Exception as e:
             logger.error(f"[{self.request_id}] 直接更新 Usage 状态失败: {e}")
+
+
+class StreamTelemetryQueue:
+    """
+    流式遥测写入队列
+
+    流结束后把统计记录任务放入有界队列，由少量后台 worker 依次执行，
+    响应协程无需等待统计延迟和数据库写入即可结束。
+    """
+
+    def __init__(self, worker_count: int = 4, maxsize: int = 10000):
+        """
+        Args:
+            worker_count: 后台 worker 数量
+            maxsize: 队列容量，队列满时调用方退回直接记录
+        """
+        self.worker_count = worker_count
+        self.maxsize = maxsize
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        """启动后台 worker"""
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._workers = [
+            asyncio.create_task(self._worker_loop(self._queue)) for _ in range(self.worker_count)
+        ]
+        logger.info(f"流式遥测队列已启动，worker 数: {self.worker_count}")
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """等待队列中的记录写完（最多 timeout 秒）后停止 worker"""
+        if not self._workers or self._queue is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"流式遥测队列关闭超时，丢弃 {self._queue.qsize()} 条待写入记录")
+
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+        logger.info("流式遥测队列已停止")
+
+    def submit(self, job: Callable[[], Awaitable[None]]) -> bool:
+        """提交记录任务；队列未启动或已满时返回 False"""
+        if self._queue is None:
+            return False
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            logger.warning("流式遥测队列已满，直接记录统计信息")
+            return False
+        return True
+
+    async def _worker_loop(self, queue: asyncio.Queue) -> None:
+        while True:
+            job = await queue.get()
+            try:
+                await job()
+            except Exception:
+                logger.exception("流式遥测记录任务失败")
+            finally:
+                queue.task_done()
+
+
+# 全局单例
+_stream_telemetry_queue: Optional[StreamTelemetryQueue] = None
+
+
+def get_stream_telemetry_queue() -> StreamTelemetryQueue:
+    """获取全局流式遥测队列"""
+    global _stream_telemetry_queue
+    if _stream_telemetry_queue is None:
+        _stream_telemetry_queue = StreamTelemetryQueue()
+    return _stream_telemetry_queue
+
+
+async def init_stream_telemetry_queue() -> None:
+    """初始化并启动流式遥测队列"""
+    await get_stream_telemetry_queue().start()
+
+
+async def shutdown_stream_telemetry_queue() -> None:
+    """关闭流式遥测队列（先写完待处理的记录）"""
+    await get_stream_telemetry_queue().stop()
@@ -0,0 +1,74 @@
+"""
+遥测事件 - MessageTelemetry 的入参
+
+一次请求的 Usage/Audit 记录所需的全部字段打包为一个不可变对象，
+调用方构建一次后按引用传递（也可以放入后台遥测队列），
+避免每次调用都组装十几个关键字参数。
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from src.api.handlers.base.response_parser import DATACLASS_SLOTS
+
+
+@dataclass(frozen=True, **DATACLASS_SLOTS)
+class TelemetrySuccess:
+    """成功请求的遥测数据"""
+
+    provider: str
+    model: str
+    input_tokens: int
+    output_tokens: int
+    response_time_ms: int
+    status_code: int
+    request_body: Dict[str, Any]
+    request_headers: Dict[str, Any]
+    response_body: Any
+    response_headers: Dict[str, Any]
+    cache_creation_tokens: int = 0
+    cache_read_tokens: int = 0
+    is_stream: bool = False
+    provider_request_headers: Optional[Dict[str, Any]] = None
+    api_format: Optional[str] = None
+    # Provider 侧追踪信息（用于记录真实成本）
+    provider_id: Optional[str] = None
+    provider_endpoint_id: Optional[str] = None
+    provider_api_key_id: Optional[str] = None
+    # 模型映射信息
+    target_model: Optional[str] = None
+    # Provider 响应元数据（如 Gemini 的 modelVersion）
+    response_metadata: Optional[Dict[str, Any]] = None
+
+
+@dataclass(frozen=True, **DATACLASS_SLOTS)
+class TelemetryFailure:
+    """
+    失败请求的遥测数据
+
+    Provider 链路信息（provider_id, endpoint_id, key_id）不在此处记录，
+    因为 RequestCandidate 表已经记录了完整的请求链路追踪信息。
+    """
+
+    provider: str
+    model: str
+    response_time_ms: int
+    status_code: int
+    error_message: str
+    request_body: Dict[str, Any]
+    request_headers: Dict[str, Any]
+    is_stream: bool
+    api_format: Optional[str] = None
+    provider_request_headers: Optional[Dict[str, Any]] = None
+    # 预估 token 信息（来自 message_start 事件，用于中断请求的成本估算）
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_creation_tokens: int = 0
+    cache_read_tokens: int = 0
+    # 响应体（如果有部分响应）
+    response_body: Optional[Dict[str, Any]] = None
+    # 模型映射信息
+    target_model: Optional[str] = None
+
+
+__all__ = ["TelemetryFailure", "TelemetrySuccess"]
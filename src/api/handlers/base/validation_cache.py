@@ -0,0 +1,35 @@
+"""
+请求校验结果缓存 - Chat 适配器共用
+
+相同请求体（重试、评测脚本重复提交）无需重复执行 Pydantic 校验，
+各适配器用 SyncLRUCache 按这里计算的请求体摘要缓存已校验的请求对象。
+缓存的请求对象在多个请求间共享，下游只读取它（model/stream 等），不得修改。
+"""
+
+import hashlib
+from typing import Any, Dict, Optional
+
+from src.utils.json_utils import json_dumps
+
+# 超过该大小的请求体（如内联图片）不缓存，避免缓存占用过多内存
+VALIDATE_CACHE_MAX_BODY_BYTES = 256 * 1024
+
+
+def validate_cache_key(body: Dict[str, Any]) -> Optional[bytes]:
+    """
+    计算请求体的缓存键
+
+    带 metadata（可能含每次请求不同的标识）、过大或无法序列化的请求体返回 None（不缓存）。
+    """
+    if "metadata" in body:
+        return None
+    try:
+        serialized = json_dumps(body)
+    except (TypeError, ValueError):
+        return None
+    if len(serialized) > VALIDATE_CACHE_MAX_BODY_BYTES:
+        return None
+    return hashlib.blake2b(serialized, digest_size=16).digest()
+
+
+__all__ = ["VALIDATE_CACHE_MAX_BODY_BYTES", "validate_cache_key"]
@@ -4,7 +4,10 @@ Claude Chat Adapter - 基于 ChatAdapterBase 的 Claude Chat API 适配器
 处理 /v1/messages 端点的 Claude Chat 格式请求。
 """
 
-from typing import Any, Dict, Optional, Type
+import re
+from collections import Counter
+from operator import attrgetter
+from typing import Any, Dict, Mapping, Optional, Type
 
 from fastapi import HTTPException, Request
 from fastapi.responses import JSONResponse
@@ -13,9 +16,22 @@ from src.api.base.adapter import ApiAdapter, ApiMode
 from src.api.base.context import ApiRequestContext
 from src.api.handlers.base.chat_adapter_base import ChatAdapterBase, register_adapter
 from src.api.handlers.base.chat_handler_base import ChatHandlerBase
+from src.api.handlers.base.validation_cache import validate_cache_key
+from src.core.cache_utils import SyncLRUCache
 from src.core.logger import logger
 from src.core.optimization_utils import TokenCounter
 from src.models.claude import ClaudeMessagesRequest, ClaudeTokenCountRequest
+from src.utils.request_utils import get_bearer_token
+
+# anthropic-beta 中的 context-1m 标识（大小写不敏感，避免对整个请求头做 lower()）
+_CONTEXT_1M_RE = re.compile("context-1m", re.IGNORECASE)
+
+# 校验结果缓存，键见 validate_cache_key（缓存的请求对象跨请求共享，只读）
+_VALIDATED_REQUEST_CACHE = SyncLRUCache(max_size=1024, ttl=300)
+
+
+# 进程内共享的计数器，编码器只加载一次（不必每个 count_tokens 请求重新查找）
+_token_counter = TokenCounter()
 
 
 class ClaudeCapabilityDetector:
@@ -23,7 +39,7 @@ class ClaudeCapabilityDetector:
 
     @staticmethod
     def detect_from_headers(
-        headers: Dict[str, str],
+        headers: Mapping[str, str],
         request_body: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, bool]:
         """
@@ -33,22 +49,15 @@ class ClaudeCapabilityDetector:
         - anthropic-beta: context-1m-xxx -> context_1m: True
 
         Args:
-            headers: 请求头字典
+            headers: 请求头（Starlette Headers 或 dict(request.headers)，键为小写）
             request_body: 请求体（Claude 不使用，保留用于接口统一）
         """
         requirements: Dict[str, bool] = {}
 
-        # 检查 anthropic-beta 请求头（大小写不敏感）
-        beta_header = None
-        for key, value in headers.items():
-            if key.lower() == "anthropic-beta":
-                beta_header = value
-                break
-
-        if beta_header:
-            # 检查是否包含 context-1m 标识
-            if "context-1m" in beta_header.lower():
-                requirements["context_1m"] = True
+        # 请求头键已由 Starlette 统一为小写，直接查找，无需遍历全部请求头
+        beta_header = headers.get("anthropic-beta")
+        if beta_header and _CONTEXT_1M_RE.search(beta_header):
+            requirements["context_1m"] = True
 
         return requirements
 
@@ -115,10 +124,15 @@ class ClaudeChatAdapter(ChatAdapterBase):
             if missing_fields:
                 raise ValueError(f"Missing required fields: {', '.join(missing_fields)}")
 
-            request = ClaudeMessagesRequest.model_validate(
-                original_request_body,
-                strict=False,
-            )
+            cache_key = validate_cache_key(original_request_body)
+            request = _VALIDATED_REQUEST_CACHE.get(cache_key) if cache_key else None
+            if request is None:
+                request = ClaudeMessagesRequest.model_validate(
+                    original_request_body,
+                    strict=False,
+                )
+                if cache_key:
+                    _VALIDATED_REQUEST_CACHE.set(cache_key, request)
         except ValueError as e:
             logger.error(f"请求体基本验证失败: {str(e)}")
             raise HTTPException(status_code=400, detail=str(e))
@@ -134,9 +148,7 @@ class ClaudeChatAdapter(ChatAdapterBase):
 
     def _build_audit_metadata(self, _payload: Dict[str, Any], request_obj) -> Dict[str, Any]:
         """构建 Claude Chat 特定的审计元数据"""
-        role_counts: dict[str, int] = {}
-        for message in request_obj.messages:
-            role_counts[message.role] = role_counts.get(message.role, 0) + 1
+        role_counts: dict[str, int] = dict(Counter(map(attrgetter("role"), request_obj.messages)))
 
         return {
             "action": "claude_messages",
@@ -178,10 +190,7 @@ class ClaudeTokenCountAdapter(ApiAdapter):
         if api_key:
             return api_key
         # 降级到 Authorization: Bearer
-        authorization = request.headers.get("authorization")
-        if authorization and authorization.startswith("Bearer "):
-            return authorization.replace("Bearer ", "")
-        return None
+        return get_bearer_token(request)
 
     async def handle(self, context: ApiRequestContext):
         payload = context.ensure_json_body()
@@ -192,21 +201,21 @@ class ClaudeTokenCountAdapter(ApiAdapter):
             logger.error(f"Token count payload invalid: {e}")
             raise HTTPException(status_code=400, detail="Invalid token count payload") from e
 
-        token_counter = TokenCounter()
         total_tokens = 0
 
         if request.system:
             if isinstance(request.system, str):
-                total_tokens += token_counter.count_tokens(request.system, request.model)
+                system_texts = [request.system]
             elif isinstance(request.system, list):
-                for block in request.system:
-                    if hasattr(block, "text"):
-                        total_tokens += token_counter.count_tokens(block.text, request.model)
+                system_texts = [block.text for block in request.system if hasattr(block, "text")]
+            else:
+                system_texts = []
+            total_tokens += _token_counter.count_tokens_batch(system_texts, request.model)
 
         messages_dict = [
             msg.model_dump() if hasattr(msg, "model_dump") else msg for msg in request.messages
         ]
-        total_tokens += token_counter.count_messages_tokens(messages_dict, request.model)
+        total_tokens += _token_counter.count_messages_tokens(messages_dict, request.model)
 
         context.add_audit_metadata(
             action="claude_token_count",
@@ -6,13 +6,46 @@ OpenAI -> Claude 格式转换器
 
 from __future__ import annotations
 
-import json
 import time
 import uuid
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Union
 
 from pydantic import BaseModel
 
+from src.utils.json_utils import JSONDecodeError, json_loads
+
+# 内容类型常量
+_CONTENT_TYPE_TEXT = "text"
+_CONTENT_TYPE_IMAGE = "image"
+_CONTENT_TYPE_TOOL_USE = "tool_use"
+_CONTENT_TYPE_TOOL_RESULT = "tool_result"
+
+# 停止原因映射（OpenAI -> Claude）
+_FINISH_REASON_MAP: Dict[str, str] = {
+    "stop": "end_turn",
+    "length": "max_tokens",
+    "tool_calls": "tool_use",
+    "function_call": "tool_use",
+    "content_filter": "end_turn",
+}
+
+# 工具选择映射（OpenAI 字符串取值 -> Claude），返回时复制，避免调用方修改共享对象
+_TOOL_CHOICE_MAP: Dict[str, Dict[str, Any]] = {
+    "none": {"type": "none"},
+    "auto": {"type": "auto"},
+    "required": {"type": "any"},
+}
+
+# 流式增量事件模板：每个 chunk 复制模板（dict.copy 为一次 C 调用）再填入变化字段，
+# 比逐键构造 dict 字面量更快。模板本身只读，嵌套的 delta 也各自复制
+_CONTENT_BLOCK_DELTA_EVENT_TMPL: Dict[str, Any] = {
+    "type": "content_block_delta",
+    "index": 0,
+    "delta": None,
+}
+_TEXT_DELTA_TMPL: Dict[str, Any] = {"type": "text_delta", "text": ""}
+_INPUT_JSON_DELTA_TMPL: Dict[str, Any] = {"type": "input_json_delta", "partial_json": ""}
+
 
 class OpenAIToClaudeConverter:
     """
@@ -24,20 +57,14 @@ class OpenAIToClaudeConverter:
     - 流式转换：OpenAI SSE -> Claude SSE
     """
 
-    # 内容类型常量
-    CONTENT_TYPE_TEXT = "text"
-    CONTENT_TYPE_IMAGE = "image"
-    CONTENT_TYPE_TOOL_USE = "tool_use"
-    CONTENT_TYPE_TOOL_RESULT = "tool_result"
+    # 内容类型常量（方法内部直接使用模块级常量，省去 self 属性查找）
+    CONTENT_TYPE_TEXT = _CONTENT_TYPE_TEXT
+    CONTENT_TYPE_IMAGE = _CONTENT_TYPE_IMAGE
+    CONTENT_TYPE_TOOL_USE = _CONTENT_TYPE_TOOL_USE
+    CONTENT_TYPE_TOOL_RESULT = _CONTENT_TYPE_TOOL_RESULT
 
     # 停止原因映射（OpenAI -> Claude）
-    FINISH_REASON_MAP = {
-        "stop": "end_turn",
-        "length": "max_tokens",
-        "tool_calls": "tool_use",
-        "function_call": "tool_use",
-        "content_filter": "end_turn",
-    }
+    FINISH_REASON_MAP = _FINISH_REASON_MAP
 
     def __init__(self, model_mapping: Optional[Dict[str, str]] = None):
         """
@@ -45,6 +72,12 @@ class OpenAIToClaudeConverter:
             model_mapping: OpenAI 模型到 Claude 模型的映射
         """
         self._model_mapping = model_mapping or {}
+        # 按角色分派的消息转换方法（system 消息在 convert_request 中单独提取）
+        self._role_handlers: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+            "user": self._convert_user_message,
+            "assistant": self._convert_assistant_message,
+            "tool": self._convert_tool_message,
+        }
 
     # ==================== 请求转换 ====================
 
@@ -71,6 +104,9 @@ class OpenAIToClaudeConverter:
         system_content: Optional[str] = None
         claude_messages: List[Dict[str, Any]] = []
 
+        role_handlers = self._role_handlers
+        append_message = claude_messages.append
+
         for message in data.get("messages", []):
             role = message.get("role")
 
@@ -79,10 +115,18 @@ class OpenAIToClaudeConverter:
                 system_content = self._collapse_content(message.get("content"))
                 continue
 
-            # 转换其他消息
-            converted = self._convert_message(message)
-            if converted:
-                claude_messages.append(converted)
+            # 转换其他消息（未知角色忽略）
+            handler = role_handlers.get(role)
+            if handler is not None:
+                append_message(handler(message))
+
+        # 可选参数只查找一次（model_dump 已去掉 None，dict 输入仍可能包含 None）
+        temperature = data.get("temperature")
+        top_p = data.get("top_p")
+        stream = data.get("stream")
+        stop = data.get("stop")
+        tools = data.get("tools")
+        tool_choice = data.get("tool_choice")
 
         # 构建 Claude 请求
         result: Dict[str, Any] = {
@@ -91,41 +135,32 @@ class OpenAIToClaudeConverter:
             "max_tokens": data.get("max_tokens") or 4096,
         }
 
-        # 可选参数
-        if data.get("temperature") is not None:
-            result["temperature"] = data["temperature"]
-        if data.get("top_p") is not None:
-            result["top_p"] = data["top_p"]
-        if data.get("stream"):
-            result["stream"] = data["stream"]
-        if data.get("stop"):
-            result["stop_sequences"] = self._convert_stop(data["stop"])
+        if temperature is not None:
+            result["temperature"] = temperature
+        if top_p is not None:
+            result["top_p"] = top_p
+        if stream:
+            result["stream"] = stream
+        if stop:
+            result["stop_sequences"] = self._convert_stop(stop)
         if system_content:
             result["system"] = system_content
 
-        # 工具转换
-        tools = self._convert_tools(data.get("tools"))
+        # 工具转换（未提供工具时不进入转换函数）
         if tools:
-            result["tools"] = tools
+            converted_tools = self._convert_tools(tools)
+            if converted_tools:
+                result["tools"] = converted_tools
 
-        tool_choice = self._convert_tool_choice(data.get("tool_choice"))
-        if tool_choice:
-            result["tool_choice"] = tool_choice
+        if tool_choice is not None:
+            result["tool_choice"] = self._convert_tool_choice(tool_choice)
 
         return result
 
     def _convert_message(self, message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """转换单条消息"""
-        role = message.get("role")
-
-        if role == "user":
-            return self._convert_user_message(message)
-        if role == "assistant":
-            return self._convert_assistant_message(message)
-        if role == "tool":
-            return self._convert_tool_message(message)
-
-        return None
+        handler = self._role_handlers.get(message.get("role"))
+        return handler(message) if handler is not None else None
 
     def _convert_user_message(self, message: Dict[str, Any]) -> Dict[str, Any]:
         """转换用户消息"""
@@ -134,15 +169,17 @@ class OpenAIToClaudeConverter:
         if isinstance(content, str) or content is None:
             return {"role": "user", "content": content or ""}
 
+        # 只有一个文本块时等价于字符串内容，直接返回字符串，不构建内容块列表
+        if len(content) == 1 and content[0].get("type") == "text":
+            return {"role": "user", "content": content[0].get("text", "")}
+
         # 转换内容数组
         claude_content: List[Dict[str, Any]] = []
         for item in content:
             item_type = item.get("type")
 
             if item_type == "text":
-                claude_content.append(
-                    {"type": self.CONTENT_TYPE_TEXT, "text": item.get("text", "")}
-                )
+                claude_content.append({"type": _CONTENT_TYPE_TEXT, "text": item.get("text", "")})
             elif item_type == "image_url":
                 image_url = (item.get("image_url") or {}).get("url", "")
                 claude_content.append(self._convert_image_url(image_url))
@@ -156,41 +193,66 @@ class OpenAIToClaudeConverter:
         # 处理文本内容
         content = message.get("content")
         if isinstance(content, str):
-            content_blocks.append({"type": self.CONTENT_TYPE_TEXT, "text": content})
+            content_blocks.append({"type": _CONTENT_TYPE_TEXT, "text": content})
         elif isinstance(content, list):
             for part in content:
                 if part.get("type") == "text":
                     content_blocks.append(
-                        {"type": self.CONTENT_TYPE_TEXT, "text": part.get("text", "")}
+                        {"type": _CONTENT_TYPE_TEXT, "text": part.get("text", "")}
                     )
 
         # 处理工具调用
-        for tool_call in message.get("tool_calls") or []:
-            if tool_call.get("type") == "function":
-                function = tool_call.get("function", {})
-                arguments = function.get("arguments", "{}")
-                try:
-                    input_data = json.loads(arguments)
-                except json.JSONDecodeError:
-                    input_data = {"raw": arguments}
-
-                content_blocks.append(
-                    {
-                        "type": self.CONTENT_TYPE_TOOL_USE,
-                        "id": tool_call.get("id", ""),
-                        "name": function.get("name", ""),
-                        "input": input_data,
-                    }
-                )
+        tool_calls = message.get("tool_calls")
+        if tool_calls:
+            content_blocks.extend(self._convert_tool_calls(tool_calls))
 
         # 简化单文本内容
         if not content_blocks:
             return {"role": "assistant", "content": ""}
-        if len(content_blocks) == 1 and content_blocks[0]["type"] == self.CONTENT_TYPE_TEXT:
+        if len(content_blocks) == 1 and content_blocks[0]["type"] == _CONTENT_TYPE_TEXT:
             return {"role": "assistant", "content": content_blocks[0]["text"]}
 
         return {"role": "assistant", "content": content_blocks}
 
+    def _convert_tool_calls(self, tool_calls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """转换工具调用为 tool_use 内容块"""
+        blocks: List[Dict[str, Any]] = []
+        for tool_call in tool_calls:
+            if tool_call.get("type") != "function":
+                continue
+
+            # 字段齐全是常态，直接取值；缺字段时再按默认值补齐
+            try:
+                function = tool_call["function"]
+                arguments = function["arguments"]
+                tool_id = tool_call["id"]
+                name = function["name"]
+            except KeyError:
+                function = tool_call.get("function", {})
+                arguments = function.get("arguments", "{}")
+                tool_id = tool_call.get("id", "")
+                name = function.get("name", "")
+
+            # input 必须是真正的 dict：响应随后会被 JSON 序列化，json/orjson 都不接受惰性 Mapping。
+            # 无参数调用（"{}"）很常见，直接给出空 dict，不进入解析器
+            if arguments == "{}":
+                input_data = {}
+            else:
+                try:
+                    input_data = json_loads(arguments)
+                except JSONDecodeError:
+                    input_data = {"raw": arguments}
+
+            blocks.append(
+                {
+                    "type": _CONTENT_TYPE_TOOL_USE,
+                    "id": tool_id,
+                    "name": name,
+                    "input": input_data,
+                }
+            )
+        return blocks
+
     def _convert_tool_message(self, message: Dict[str, Any]) -> Dict[str, Any]:
         """转换工具结果消息"""
         tool_content = message.get("content", "")
@@ -199,12 +261,12 @@ class OpenAIToClaudeConverter:
         parsed_content = tool_content
         if isinstance(tool_content, str):
             try:
-                parsed_content = json.loads(tool_content)
-            except json.JSONDecodeError:
+                parsed_content = json_loads(tool_content)
+            except JSONDecodeError:
                 pass
 
         tool_block = {
-            "type": self.CONTENT_TYPE_TOOL_RESULT,
+            "type": _CONTENT_TYPE_TOOL_RESULT,
             "tool_use_id": message.get("tool_call_id", ""),
             "content": parsed_content,
         }
@@ -240,12 +302,9 @@ class OpenAIToClaudeConverter:
         """转换工具选择"""
         if tool_choice is None:
             return None
-        if tool_choice == "none":
-            return {"type": "none"}
-        if tool_choice == "auto":
-            return {"type": "auto"}
-        if tool_choice == "required":
-            return {"type": "any"}
+        if isinstance(tool_choice, str):
+            mapped = _TOOL_CHOICE_MAP.get(tool_choice)
+            return mapped.copy() if mapped else {"type": "auto"}
         if isinstance(tool_choice, dict) and tool_choice.get("type") == "function":
             function = tool_choice.get("function", {})
             return {"type": "tool_use", "name": function.get("name", "")}
@@ -255,13 +314,16 @@ class OpenAIToClaudeConverter:
     def _convert_image_url(self, image_url: str) -> Dict[str, Any]:
         """转换图片 URL"""
         if image_url.startswith("data:"):
+            # 只在（很短的）header 上查找分隔符，不对整个 base64 数据做正则扫描
             header, _, data = image_url.partition(",")
-            media_type = "image/jpeg"
-            if ";" in header:
-                media_type = header.split(";")[0].split(":")[-1]
+            semicolon = header.find(";")
+            if semicolon == -1:
+                media_type = "image/jpeg"
+            else:
+                media_type = header[:semicolon].rpartition(":")[2]
 
             return {
-                "type": self.CONTENT_TYPE_IMAGE,
+                "type": _CONTENT_TYPE_IMAGE,
                 "source": {
                     "type": "base64",
                     "media_type": media_type,
@@ -269,7 +331,7 @@ class OpenAIToClaudeConverter:
                 },
             }
 
-        return {"type": self.CONTENT_TYPE_TEXT, "text": f"[Image: {image_url}]"}
+        return {"type": _CONTENT_TYPE_TEXT, "text": f"[Image: {image_url}]"}
 
     def _convert_stop(self, stop: Optional[Union[str, List[str]]]) -> Optional[List[str]]:
         """转换停止序列"""
@@ -306,33 +368,19 @@ class OpenAIToClaudeConverter:
         if text_content:
             content.append(
                 {
-                    "type": self.CONTENT_TYPE_TEXT,
+                    "type": _CONTENT_TYPE_TEXT,
                     "text": text_content,
                 }
             )
 
         # 处理工具调用
-        for tool_call in message.get("tool_calls") or []:
-            if tool_call.get("type") == "function":
-                function = tool_call.get("function", {})
-                arguments = function.get("arguments", "{}")
-                try:
-                    input_data = json.loads(arguments)
-                except json.JSONDecodeError:
-                    input_data = {"raw": arguments}
-
-                content.append(
-                    {
-                        "type": self.CONTENT_TYPE_TOOL_USE,
-                        "id": tool_call.get("id", ""),
-                        "name": function.get("name", ""),
-                        "input": input_data,
-                    }
-                )
+        tool_calls = message.get("tool_calls")
+        if tool_calls:
+            content.extend(self._convert_tool_calls(tool_calls))
 
         # 转换 finish_reason
         finish_reason = choice.get("finish_reason")
-        stop_reason = self.FINISH_REASON_MAP.get(finish_reason, "end_turn")
+        stop_reason = _FINISH_REASON_MAP.get(finish_reason, "end_turn")
 
         # 转换 usage
         usage = response.get("usage", {})
@@ -386,21 +434,34 @@ class OpenAIToClaudeConverter:
         Returns:
             Claude SSE 事件列表
         """
-        events: List[Dict[str, Any]] = []
-
-        choices = chunk.get("choices", [])
+        choices = chunk.get("choices")
         if not choices:
-            return events
+            return []
 
         choice = choices[0]
         delta = choice.get("delta", {})
         finish_reason = choice.get("finish_reason")
+        role = delta.get("role")
+        content_delta = delta.get("content")
+        tool_calls = delta.get("tool_calls")
+
+        # 快速路径：纯文本增量（流中绝大多数 chunk），直接产出单个事件
+        if not finish_reason and not tool_calls and (message_started or not role):
+            if isinstance(content_delta, str):
+                event = _CONTENT_BLOCK_DELTA_EVENT_TMPL.copy()
+                text_delta = _TEXT_DELTA_TMPL.copy()
+                text_delta["text"] = content_delta
+                event["delta"] = text_delta
+                return [event]
+            return []
+
+        events: List[Dict[str, Any]] = []
+        append_event = events.append
 
         # 处理角色（第一个 chunk）
-        role = delta.get("role")
         if role and not message_started:
             msg_id = message_id or f"msg_{uuid.uuid4().hex[:8]}"
-            events.append(
+            append_event(
                 {
                     "type": "message_start",
                     "message": {
@@ -416,30 +477,26 @@ class OpenAIToClaudeConverter:
             )
 
         # 处理文本内容
-        content_delta = delta.get("content")
         if isinstance(content_delta, str):
-            events.append(
-                {
-                    "type": "content_block_delta",
-                    "index": 0,
-                    "delta": {"type": "text_delta", "text": content_delta},
-                }
-            )
+            event = _CONTENT_BLOCK_DELTA_EVENT_TMPL.copy()
+            text_delta = _TEXT_DELTA_TMPL.copy()
+            text_delta["text"] = content_delta
+            event["delta"] = text_delta
+            append_event(event)
 
         # 处理工具调用
-        tool_calls = delta.get("tool_calls", [])
-        for tool_call in tool_calls:
+        for tool_call in tool_calls or ():
             index = tool_call.get("index", 0)
+            function = tool_call.get("function", {})
 
             # 工具调用开始
             if "id" in tool_call:
-                function = tool_call.get("function", {})
-                events.append(
+                append_event(
                     {
                         "type": "content_block_start",
                         "index": index,
                         "content_block": {
-                            "type": self.CONTENT_TYPE_TOOL_USE,
+                            "type": _CONTENT_TYPE_TOOL_USE,
                             "id": tool_call["id"],
                             "name": function.get("name", ""),
                         },
@@ -447,23 +504,18 @@ class OpenAIToClaudeConverter:
                 )
 
             # 工具调用参数增量
-            function = tool_call.get("function", {})
             if "arguments" in function:
-                events.append(
-                    {
-                        "type": "content_block_delta",
-                        "index": index,
-                        "delta": {
-                            "type": "input_json_delta",
-                            "partial_json": function.get("arguments", ""),
-                        },
-                    }
-                )
+                event = _CONTENT_BLOCK_DELTA_EVENT_TMPL.copy()
+                event["index"] = index
+                input_delta = _INPUT_JSON_DELTA_TMPL.copy()
+                input_delta["partial_json"] = function["arguments"]
+                event["delta"] = input_delta
+                append_event(event)
 
         # 处理结束
         if finish_reason:
-            stop_reason = self.FINISH_REASON_MAP.get(finish_reason, "end_turn")
-            events.append(
+            stop_reason = _FINISH_REASON_MAP.get(finish_reason, "end_turn")
+            append_event(
                 {
                     "type": "message_delta",
                     "delta": {"stop_reason": stop_reason},
@@ -483,8 +535,17 @@ class OpenAIToClaudeConverter:
         if not content:
             return None
 
-        text_parts = [part.get("text", "") for part in content if part.get("type") == "text"]
-        return "\n\n".join(filter(None, text_parts)) or None
+        # 单个推导式同时筛选类型并跳过空文本（join 传列表比传生成器更快）
+        return (
+            "\n\n".join(
+                [
+                    text
+                    for part in content
+                    if part.get("type") == "text" and (text := part.get("text"))
+                ]
+            )
+            or None
+        )
 
 
 __all__ = ["OpenAIToClaudeConverter"]
@@ -8,6 +8,37 @@ Claude Chat Handler - 基于通用 Chat Handler 基类的简化实现
 from typing import Any, Dict, Optional
 
 from src.api.handlers.base.chat_handler_base import ChatHandlerBase
+from src.api.handlers.claude.converter import OpenAIToClaudeConverter
+from src.models.claude import ClaudeMessagesRequest
+from src.models.openai import OpenAIRequest
+
+# 转换器无状态（不使用模型映射），所有请求共享一个实例
+_OPENAI_TO_CLAUDE_CONVERTER = OpenAIToClaudeConverter()
+
+# 只出现在 Claude 请求顶层的字段
+_CLAUDE_ONLY_KEYS = ("system", "stop_sequences", "top_k", "thinking")
+# 只出现在 OpenAI 消息中的角色
+_OPENAI_ONLY_ROLES = frozenset(("system", "tool", "developer", "function"))
+
+
+def _looks_like_claude(request: Dict[str, Any]) -> bool:
+    """
+    判断 dict 请求是否已经是 Claude 格式
+
+    消息中出现 OpenAI 特有的角色或 tool_calls 时一定不是；
+    否则顶层带有 Claude 特有字段、或工具定义使用 input_schema 时视为 Claude 格式。
+    """
+    for message in request.get("messages") or ():
+        if not isinstance(message, dict):
+            return False
+        if message.get("role") in _OPENAI_ONLY_ROLES or "tool_calls" in message:
+            return False
+
+    if any(key in request for key in _CLAUDE_ONLY_KEYS):
+        return True
+
+    tools = request.get("tools")
+    return bool(tools) and all(isinstance(tool, dict) and "input_schema" in tool for tool in tools)
 
 
 class ClaudeChatHandler(ChatHandlerBase):
@@ -59,9 +90,7 @@ class ClaudeChatHandler(ChatHandlerBase):
         Returns:
             更新了 model 字段的请求体
         """
-        result = dict(request_body)
-        result["model"] = mapped_model
-        return result
+        return self.build_provider_payload(request_body, mapped_model=mapped_model)
 
     async def _convert_request(self, request):
         """
@@ -73,28 +102,29 @@ class ClaudeChatHandler(ChatHandlerBase):
         Returns:
             ClaudeMessagesRequest 对象
         """
-        from src.api.handlers.claude.converter import OpenAIToClaudeConverter
-        from src.models.claude import ClaudeMessagesRequest
-        from src.models.openai import OpenAIRequest
-
         # 如果已经是 Claude 格式，直接返回
         if isinstance(request, ClaudeMessagesRequest):
             return request
 
         # 如果是 OpenAI 格式，转换为 Claude 格式
         if isinstance(request, OpenAIRequest):
-            converter = OpenAIToClaudeConverter()
-            claude_dict = converter.convert_request(request.dict())
-            return ClaudeMessagesRequest(**claude_dict)
+            # 直接传入模型，由转换器以 model_dump(exclude_none=True) 序列化
+            claude_dict = _OPENAI_TO_CLAUDE_CONVERTER.convert_request(request)
+            # 输入已通过 OpenAIRequest 校验，转换结果由我们自己的转换器生成，跳过二次校验
+            # （调用方只读取 model 等顶层字段，嵌套消息保持 dict 形式即可）
+            return ClaudeMessagesRequest.model_construct(**claude_dict)
 
         # 如果是字典，根据内容判断格式
         if isinstance(request, dict):
+            # 已是 Claude 格式时跳过 OpenAI 转换器，直接校验构建
+            if _looks_like_claude(request):
+                return ClaudeMessagesRequest(**request)
+
             if "messages" in request and len(request["messages"]) > 0:
                 first_msg = request["messages"][0]
                 if "role" in first_msg and "content" in first_msg:
                     # 可能是 OpenAI 格式
-                    converter = OpenAIToClaudeConverter()
-                    claude_dict = converter.convert_request(request)
+                    claude_dict = _OPENAI_TO_CLAUDE_CONVERTER.convert_request(request)
                     return ClaudeMessagesRequest(**claude_dict)
 
             # 否则假设已经是 Claude 格式
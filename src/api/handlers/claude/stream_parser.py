@@ -6,8 +6,100 @@ Claude SSE 流解析器
 
 from __future__ import annotations
 
-import json
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.utils.json_utils import JSONDecodeError, json_loads
+
+_EVENT_PREFIX = b"event: "
+_DATA_PREFIX = b"data: "
+_DONE = b"[DONE]"
+
+
+def _iter_events(data: bytes) -> Iterator[Dict[str, Any]]:
+    """
+    逐行解析 SSE 字节数据
+
+    在字节层面切分与匹配前缀，只把 event 名和 JSON 负载交给解码/解析，
+    不为整段数据构造中间字符串。
+    """
+    current_event_type: Optional[str] = None
+
+    for line in data.split(b"\n"):
+        line = line.strip()
+        if not line:
+            continue
+
+        # 解析事件类型行
+        if line.startswith(_EVENT_PREFIX):
+            current_event_type = line[7:].decode("utf-8", errors="replace")
+            continue
+
+        # 解析数据行
+        if line.startswith(_DATA_PREFIX):
+            data_bytes = line[6:]
+
+            # 处理 [DONE] 标记
+            if data_bytes == _DONE:
+                yield {"type": "__done__", "raw": "[DONE]"}
+                continue
+
+            try:
+                event = json_loads(data_bytes)
+            except ValueError:
+                # 无法解析的数据（含非法 UTF-8），跳过
+                pass
+            else:
+                # 如果数据中没有 type，使用事件行的类型
+                if isinstance(event, dict) and "type" not in event and current_event_type:
+                    event["type"] = current_event_type
+                yield event
+
+            current_event_type = None
+
+
+class ClaudeStreamBuffer:
+    """
+    单个 SSE 流的增量解析缓冲区
+
+    只解析到最后一个空行（记录结束）为止的部分，不完整的记录留在缓冲区中，
+    下次调用时与新数据拼接，已解析的字节不会被重复扫描。
+    缓冲区是每个流的状态，需为每个流单独创建，不要挂在跨请求共享的解析器上。
+    """
+
+    __slots__ = ("_buf",)
+
+    def __init__(self) -> None:
+        self._buf = bytearray()
+
+    def feed(self, chunk: bytes) -> List[Dict[str, Any]]:
+        """
+        写入任意切分的网络 chunk，返回其中已完整的事件
+
+        Args:
+            chunk: 原始 SSE 字节
+
+        Returns:
+            解析后的事件列表
+        """
+        buf = self._buf
+        buf.extend(chunk)
+
+        # 记录以空行结束（兼容 \n\n 与 \r\n\r\n）
+        end = max(buf.rfind(b"\n\n"), buf.rfind(b"\n\r\n"))
+        if end == -1:
+            return []
+
+        complete = bytes(buf[: end + 1])
+        del buf[: end + 1]
+        return list(_iter_events(complete))
+
+    def flush(self) -> List[Dict[str, Any]]:
+        """流结束时解析缓冲区中剩余（未以空行结束）的数据"""
+        if not self._buf:
+            return []
+        remaining = bytes(self._buf)
+        self._buf.clear()
+        return list(_iter_events(remaining))
 
 
 class ClaudeStreamParser:
@@ -43,7 +135,9 @@ class ClaudeStreamParser:
 
     def parse_chunk(self, chunk: bytes | str) -> List[Dict[str, Any]]:
         """
-        解析 SSE 数据块
+        解析 SSE 数据块（无状态，chunk 应包含完整的 SSE 记录）
+
+        任意切分的网络 chunk 请使用每个流独立的 ClaudeStreamBuffer。
 
         Args:
             chunk: 原始 SSE 数据（bytes 或 str）
@@ -51,48 +145,9 @@ class ClaudeStreamParser:
         Returns:
             解析后的事件列表
         """
-        if isinstance(chunk, bytes):
-            text = chunk.decode("utf-8")
-        else:
-            text = chunk
-
-        events: List[Dict[str, Any]] = []
-        lines = text.strip().split("\n")
-
-        current_event_type: Optional[str] = None
-
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-
-            # 解析事件类型行
-            if line.startswith("event: "):
-                current_event_type = line[7:]
-                continue
-
-            # 解析数据行
-            if line.startswith("data: "):
-                data_str = line[6:]
-
-                # 处理 [DONE] 标记
-                if data_str == "[DONE]":
-                    events.append({"type": "__done__", "raw": "[DONE]"})
-                    continue
-
-                try:
-                    data = json.loads(data_str)
-                    # 如果数据中没有 type，使用事件行的类型
-                    if "type" not in data and current_event_type:
-                        data["type"] = current_event_type
-                    events.append(data)
-                except json.JSONDecodeError:
-                    # 无法解析的数据，跳过
-                    pass
-
-                current_event_type = None
-
-        return events
+        if isinstance(chunk, str):
+            chunk = chunk.encode("utf-8")
+        return list(_iter_events(chunk))
 
     def parse_line(self, line: str) -> Optional[Dict[str, Any]]:
         """
@@ -108,8 +163,8 @@ class ClaudeStreamParser:
             return None
 
         try:
-            return json.loads(line)
-        except json.JSONDecodeError:
+            return json_loads(line)
+        except JSONDecodeError:
             return None
 
     def is_done_event(self, event: Dict[str, Any]) -> bool:
@@ -238,4 +293,4 @@ class ClaudeStreamParser:
         return delta.get("stop_reason")
 
 
-__all__ = ["ClaudeStreamParser"]
+__all__ = ["ClaudeStreamBuffer", "ClaudeStreamParser"]
@@ -4,6 +4,7 @@ Claude CLI Adapter - 基于通用 CLI Adapter 基类的简化实现
 继承 CliAdapterBase，只需配置 FORMAT_ID 和 HANDLER_CLASS。
 """
 
+from collections import Counter
 from typing import Any, Dict, Optional, Type
 
 from fastapi import Request
@@ -11,6 +12,7 @@ from fastapi import Request
 from src.api.handlers.base.cli_adapter_base import CliAdapterBase, register_cli_adapter
 from src.api.handlers.base.cli_handler_base import CliMessageHandlerBase
 from src.api.handlers.claude.adapter import ClaudeCapabilityDetector
+from src.utils.request_utils import get_bearer_token
 
 
 @register_cli_adapter
@@ -36,10 +38,7 @@ class ClaudeCliAdapter(CliAdapterBase):
 
     def extract_api_key(self, request: Request) -> Optional[str]:
         """从请求中提取 API 密钥 (Authorization: Bearer)"""
-        authorization = request.headers.get("authorization")
-        if authorization and authorization.startswith("Bearer "):
-            return authorization.replace("Bearer ", "")
-        return None
+        return get_bearer_token(request)
 
     def detect_capability_requirements(
         self,
@@ -81,10 +80,7 @@ class ClaudeCliAdapter(CliAdapterBase):
         stream = payload.get("stream", False)
         messages = payload.get("messages", [])
 
-        role_counts = {}
-        for msg in messages:
-            role = msg.get("role", "unknown")
-            role_counts[role] = role_counts.get(role, 0) + 1
+        role_counts = dict(Counter(msg.get("role", "unknown") for msg in messages))
 
         return {
             "action": "claude_cli_request",
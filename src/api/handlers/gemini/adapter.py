@@ -4,6 +4,8 @@ Gemini Chat Adapter
 处理 Gemini API 格式的请求适配
 """
 
+from collections import Counter
+from functools import lru_cache
 from typing import Any, Dict, Optional, Type
 
 from fastapi import HTTPException, Request
@@ -13,6 +15,17 @@ from src.api.handlers.base.chat_adapter_base import ChatAdapterBase, register_ad
 from src.api.handlers.base.chat_handler_base import ChatHandlerBase
 from src.core.logger import logger
 from src.models.gemini import GeminiRequest
+from src.utils.request_utils import get_bearer_token
+
+# 审计元数据中记录的 generation_config 选项
+_AUDIT_GENERATION_OPTIONS = ("max_output_tokens", "temperature", "top_p", "top_k")
+
+
+def _content_role(content: Any) -> str:
+    """取 contents 条目的角色（校验后的模型或 model_construct 回退时的 dict），缺省为 unknown"""
+    if isinstance(content, dict):
+        return content.get("role") or "unknown"
+    return getattr(content, "role", None) or "unknown"
 
 
 @register_adapter
@@ -55,9 +68,9 @@ class GeminiChatAdapter(ChatAdapterBase):
         if query_key:
             return query_key
 
-        authorization = request.headers.get("authorization")
-        if authorization and authorization.lower().startswith("bearer "):
-            return authorization[7:].strip() or None
+        bearer_token = get_bearer_token(request)
+        if bearer_token:
+            return bearer_token
 
         # 兼容少数客户端使用 x-api-key
         return request.headers.get("x-api-key")
@@ -126,18 +139,15 @@ class GeminiChatAdapter(ChatAdapterBase):
 
     def _build_audit_metadata(self, payload: Dict[str, Any], request_obj) -> Dict[str, Any]:
         """构建 Gemini Chat 特定的审计元数据"""
-        role_counts: dict[str, int] = {}
-
-        contents = getattr(request_obj, "contents", []) or []
-        for content in contents:
-            role = getattr(content, "role", None) or content.get("role", "unknown")
-            role_counts[role] = role_counts.get(role, 0) + 1
+        contents = getattr(request_obj, "contents", None) or []
+        role_counts: dict[str, int] = dict(Counter(map(_content_role, contents)))
 
         generation_config = getattr(request_obj, "generation_config", None) or {}
-        if hasattr(generation_config, "dict"):
-            generation_config = generation_config.dict()
-        elif not isinstance(generation_config, dict):
-            generation_config = {}
+        if not isinstance(generation_config, dict):
+            # 已校验的模型：只按属性读取审计需要的选项，省去 .dict() 的整体序列化
+            generation_config = {
+                name: getattr(generation_config, name, None) for name in _AUDIT_GENERATION_OPTIONS
+            }
 
         # 判断流式模式
         stream = getattr(request_obj, "stream", False)
@@ -172,10 +182,13 @@ class GeminiChatAdapter(ChatAdapterBase):
         )
 
 
+@lru_cache(maxsize=8)
 def build_gemini_adapter(x_app_header: str = "") -> GeminiChatAdapter:
     """
     根据请求头构建适当的 Gemini 适配器
 
+    适配器不持有请求级状态，按请求头缓存实例，避免每个请求重复初始化。
+
     Args:
         x_app_header: X-App 请求头值
 
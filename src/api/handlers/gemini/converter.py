@@ -4,7 +4,123 @@ Gemini 格式转换器
 提供 Gemini 与其他 API 格式（Claude、OpenAI）之间的转换
 """
 
-from typing import Any, Dict, List, Optional
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.utils.json_utils import JSONDecodeError, json_dumps, json_loads
+
+# 生成参数映射（Claude 请求字段 -> Gemini generation_config 字段）
+_CLAUDE_GENERATION_CONFIG_MAP: Dict[str, str] = {
+    "max_tokens": "max_output_tokens",
+    "temperature": "temperature",
+    "top_p": "top_p",
+    "top_k": "top_k",
+    "stop_sequences": "stop_sequences",
+}
+
+# 停止原因映射（Gemini -> Claude）
+_CLAUDE_FINISH_REASON_MAP: Dict[str, str] = {
+    "STOP": "end_turn",
+    "MAX_TOKENS": "max_tokens",
+    "SAFETY": "content_filtered",
+    "RECITATION": "content_filtered",
+    "OTHER": "stop_sequence",
+}
+
+# 停止原因映射（Gemini -> OpenAI）
+_OPENAI_FINISH_REASON_MAP: Dict[str, str] = {
+    "STOP": "stop",
+    "MAX_TOKENS": "length",
+    "SAFETY": "content_filter",
+    "RECITATION": "content_filter",
+    "OTHER": "stop",
+}
+
+
+def _claude_text_block_to_part(block: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    return {"text": block.get("text", "")}
+
+
+def _claude_image_block_to_part(block: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    # 仅支持 base64 图片，其他来源忽略
+    source = block.get("source", {})
+    if source.get("type") != "base64":
+        return None
+    return {
+        "inline_data": {
+            "mime_type": source.get("media_type", "image/png"),
+            "data": source.get("data", ""),
+        }
+    }
+
+
+def _claude_tool_use_block_to_part(block: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    return {
+        "function_call": {
+            "name": block.get("name", ""),
+            "args": block.get("input", {}),
+        }
+    }
+
+
+def _claude_tool_result_block_to_part(block: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    return {
+        "function_response": {
+            "name": block.get("tool_use_id", ""),
+            "response": {"result": block.get("content", "")},
+        }
+    }
+
+
+# Claude 内容块类型 -> Gemini part 转换函数（返回 None 表示丢弃该块）
+_CLAUDE_BLOCK_HANDLERS: Dict[str, Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]] = {
+    "text": _claude_text_block_to_part,
+    "image": _claude_image_block_to_part,
+    "tool_use": _claude_tool_use_block_to_part,
+    "tool_result": _claude_tool_result_block_to_part,
+}
+
+
+def _claude_tool_to_declaration(tool: Dict[str, Any]) -> Dict[str, Any]:
+    """Claude 工具定义 -> Gemini function declaration"""
+    func_decl = {
+        "name": tool.get("name", ""),
+    }
+    if "description" in tool:
+        func_decl["description"] = tool["description"]
+    if "input_schema" in tool:
+        func_decl["parameters"] = tool["input_schema"]
+    return func_decl
+
+
+def _openai_tool_to_declaration(tool: Dict[str, Any]) -> Dict[str, Any]:
+    """OpenAI function 工具定义 -> Gemini function declaration"""
+    func = tool.get("function", {})
+    func_decl = {
+        "name": func.get("name", ""),
+    }
+    if "description" in func:
+        func_decl["description"] = func["description"]
+    if "parameters" in func:
+        func_decl["parameters"] = func["parameters"]
+    return func_decl
+
+
+def _gemini_part_to_claude_block(part: Dict[str, Any]) -> Dict[str, Any]:
+    """Gemini part（text 或 functionCall）-> Claude content block"""
+    if "text" in part:
+        return {
+            "type": "text",
+            "text": part["text"],
+        }
+    func_call = part["functionCall"]
+    name = func_call.get("name", "")
+    return {
+        "type": "tool_use",
+        "id": f"toolu_{name}",
+        "name": name,
+        "input": func_call.get("args", {}),
+    }
 
 
 class ClaudeToGeminiConverter:
@@ -47,22 +163,15 @@ class ClaudeToGeminiConverter:
 
     def _convert_messages(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """转换消息列表"""
-        contents = []
-        for msg in messages:
-            role = msg.get("role", "user")
-            # Gemini 使用 "model" 而不是 "assistant"
-            gemini_role = "model" if role == "assistant" else "user"
-
-            content = msg.get("content", "")
-            parts = self._convert_content_to_parts(content)
-
-            contents.append(
-                {
-                    "role": gemini_role,
-                    "parts": parts,
-                }
-            )
-        return contents
+        convert_parts = self._convert_content_to_parts
+        return [
+            {
+                # Gemini 使用 "model" 而不是 "assistant"
+                "role": "model" if msg.get("role", "user") == "assistant" else "user",
+                "parts": convert_parts(msg.get("content", "")),
+            }
+            for msg in messages
+        ]
 
     def _convert_content_to_parts(self, content: Any) -> List[Dict[str, Any]]:
         """将 Claude 内容转换为 Gemini parts"""
@@ -75,41 +184,11 @@ class ClaudeToGeminiConverter:
                 if isinstance(block, str):
                     parts.append({"text": block})
                 elif isinstance(block, dict):
-                    block_type = block.get("type")
-                    if block_type == "text":
-                        parts.append({"text": block.get("text", "")})
-                    elif block_type == "image":
-                        # 转换图片
-                        source = block.get("source", {})
-                        if source.get("type") == "base64":
-                            parts.append(
-                                {
-                                    "inline_data": {
-                                        "mime_type": source.get("media_type", "image/png"),
-                                        "data": source.get("data", ""),
-                                    }
-                                }
-                            )
-                    elif block_type == "tool_use":
-                        # 转换工具调用
-                        parts.append(
-                            {
-                                "function_call": {
-                                    "name": block.get("name", ""),
-                                    "args": block.get("input", {}),
-                                }
-                            }
-                        )
-                    elif block_type == "tool_result":
-                        # 转换工具结果
-                        parts.append(
-                            {
-                                "function_response": {
-                                    "name": block.get("tool_use_id", ""),
-                                    "response": {"result": block.get("content", "")},
-                                }
-                            }
-                        )
+                    handler = _CLAUDE_BLOCK_HANDLERS.get(block.get("type"))
+                    if handler is not None:
+                        part = handler(block)
+                        if part is not None:
+                            parts.append(part)
             return parts
 
         return [{"text": str(content)}]
@@ -132,35 +211,16 @@ class ClaudeToGeminiConverter:
 
     def _build_generation_config(self, claude_request: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """构建生成配置"""
-        config: Dict[str, Any] = {}
-
-        if "max_tokens" in claude_request:
-            config["max_output_tokens"] = claude_request["max_tokens"]
-        if "temperature" in claude_request:
-            config["temperature"] = claude_request["temperature"]
-        if "top_p" in claude_request:
-            config["top_p"] = claude_request["top_p"]
-        if "top_k" in claude_request:
-            config["top_k"] = claude_request["top_k"]
-        if "stop_sequences" in claude_request:
-            config["stop_sequences"] = claude_request["stop_sequences"]
-
+        config = {
+            gemini_key: claude_request[claude_key]
+            for claude_key, gemini_key in _CLAUDE_GENERATION_CONFIG_MAP.items()
+            if claude_key in claude_request
+        }
         return config if config else None
 
     def _convert_tools(self, tools: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """转换工具定义"""
-        function_declarations = []
-        for tool in tools:
-            func_decl = {
-                "name": tool.get("name", ""),
-            }
-            if "description" in tool:
-                func_decl["description"] = tool["description"]
-            if "input_schema" in tool:
-                func_decl["parameters"] = tool["input_schema"]
-            function_declarations.append(func_decl)
-
-        return [{"function_declarations": function_declarations}]
+        return [{"function_declarations": [_claude_tool_to_declaration(tool) for tool in tools]}]
 
 
 class GeminiToClaudeConverter:
@@ -209,27 +269,12 @@ class GeminiToClaudeConverter:
         }
 
     def _convert_parts_to_content(self, parts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """将 Gemini parts 转换为 Claude content blocks"""
-        content = []
-        for part in parts:
-            if "text" in part:
-                content.append(
-                    {
-                        "type": "text",
-                        "text": part["text"],
-                    }
-                )
-            elif "functionCall" in part:
-                func_call = part["functionCall"]
-                content.append(
-                    {
-                        "type": "tool_use",
-                        "id": f"toolu_{func_call.get('name', '')}",
-                        "name": func_call.get("name", ""),
-                        "input": func_call.get("args", {}),
-                    }
-                )
-        return content
+        """将 Gemini parts 转换为 Claude content blocks（忽略其他类型的 part）"""
+        return [
+            _gemini_part_to_claude_block(part)
+            for part in parts
+            if "text" in part or "functionCall" in part
+        ]
 
     def _convert_usage(self, usage_metadata: Dict[str, Any]) -> Dict[str, int]:
         """转换使用量信息"""
@@ -242,14 +287,7 @@ class GeminiToClaudeConverter:
 
     def _convert_finish_reason(self, finish_reason: Optional[str]) -> Optional[str]:
         """转换停止原因"""
-        mapping = {
-            "STOP": "end_turn",
-            "MAX_TOKENS": "max_tokens",
-            "SAFETY": "content_filtered",
-            "RECITATION": "content_filtered",
-            "OTHER": "stop_sequence",
-        }
-        return mapping.get(finish_reason, "end_turn")
+        return _CLAUDE_FINISH_REASON_MAP.get(finish_reason, "end_turn")
 
     def _create_empty_response(self) -> Dict[str, Any]:
         """创建空响应"""
@@ -285,24 +323,15 @@ class OpenAIToGeminiConverter:
         Returns:
             Gemini 格式的请求字典
         """
-        messages = openai_request.get("messages", [])
-
-        # 分离 system 消息和其他消息
-        system_messages = []
-        other_messages = []
-        for msg in messages:
-            if msg.get("role") == "system":
-                system_messages.append(msg)
-            else:
-                other_messages.append(msg)
+        contents, system_texts = self._convert_messages(openai_request.get("messages", []))
 
         gemini_request: Dict[str, Any] = {
-            "contents": self._convert_messages(other_messages),
+            "contents": contents,
         }
 
         # 转换 system messages
-        if system_messages:
-            system_text = "\n".join(msg.get("content", "") for msg in system_messages)
+        if system_texts:
+            system_text = "\n".join(system_texts)
             gemini_request["system_instruction"] = {"parts": [{"text": system_text}]}
 
         # 转换生成配置
@@ -317,26 +346,36 @@ class OpenAIToGeminiConverter:
 
         return gemini_request
 
-    def _convert_messages(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """转换消息列表"""
+    def _convert_messages(
+        self, messages: List[Dict[str, Any]]
+    ) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """
+        转换消息列表，一次遍历同时分离出 system 消息
+
+        Returns:
+            (Gemini contents, system 消息文本列表)
+        """
         contents = []
+        system_texts = []
         for msg in messages:
             role = msg.get("role", "user")
+            if role == "system":
+                system_texts.append(msg.get("content", ""))
+                continue
             gemini_role = "model" if role == "assistant" else "user"
 
             content = msg.get("content", "")
             parts = self._convert_content_to_parts(content)
 
             # 处理工具调用
-            tool_calls = msg.get("tool_calls", [])
+            # 由模型序列化而来的消息中 tool_calls 可能为 None
+            tool_calls = msg.get("tool_calls") or ()
             for tc in tool_calls:
                 if tc.get("type") == "function":
                     func = tc.get("function", {})
-                    import json
-
                     try:
-                        args = json.loads(func.get("arguments", "{}"))
-                    except json.JSONDecodeError:
+                        args = json_loads(func.get("arguments", "{}"))
+                    except JSONDecodeError:
                         args = {}
                     parts.append(
                         {
@@ -354,7 +393,7 @@ class OpenAIToGeminiConverter:
                         "parts": parts,
                     }
                 )
-        return contents
+        return contents, system_texts
 
     def _convert_content_to_parts(self, content: Any) -> List[Dict[str, Any]]:
         """将 OpenAI 内容转换为 Gemini parts"""
@@ -380,9 +419,10 @@ class OpenAIToGeminiConverter:
                         if url.startswith("data:"):
                             # base64 数据 URL
                             # 格式: data:image/png;base64,xxxxx
-                            try:
-                                header, data = url.split(",", 1)
-                                mime_type = header.split(":")[1].split(";")[0]
+                            header, sep, data = url.partition(",")
+                            if sep:
+                                # 只在（很短的）header 上切分，不产生中间列表
+                                mime_type = header[5:].partition(";")[0].partition(":")[0]
                                 parts.append(
                                     {
                                         "inline_data": {
@@ -391,8 +431,6 @@ class OpenAIToGeminiConverter:
                                         }
                                     }
                                 )
-                            except (ValueError, IndexError):
-                                pass
             return parts
 
         return [{"text": str(content)}]
@@ -419,20 +457,10 @@ class OpenAIToGeminiConverter:
         return config if config else None
 
     def _convert_tools(self, tools: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """转换工具定义"""
-        function_declarations = []
-        for tool in tools:
-            if tool.get("type") == "function":
-                func = tool.get("function", {})
-                func_decl = {
-                    "name": func.get("name", ""),
-                }
-                if "description" in func:
-                    func_decl["description"] = func["description"]
-                if "parameters" in func:
-                    func_decl["parameters"] = func["parameters"]
-                function_declarations.append(func_decl)
-
+        """转换工具定义（仅 function 类型）"""
+        function_declarations = [
+            _openai_tool_to_declaration(tool) for tool in tools if tool.get("type") == "function"
+        ]
         return [{"function_declarations": function_declarations}]
 
 
@@ -443,18 +471,20 @@ class GeminiToOpenAIConverter:
     将 Gemini generateContent 响应转换为 OpenAI Chat Completions API 格式
     """
 
-    def convert_response(self, gemini_response: Dict[str, Any]) -> Dict[str, Any]:
+    def convert_response(
+        self, gemini_response: Dict[str, Any], *, created: Optional[int] = None
+    ) -> Dict[str, Any]:
         """
         将 Gemini 响应转换为 OpenAI 响应
 
         Args:
             gemini_response: Gemini 格式的响应字典
+            created: 响应创建时间戳（秒）；逐块转换流式响应时由调用方传入同一个值，
+                使所有 chunk 的 created 一致，未传入时取当前时间
 
         Returns:
             OpenAI 格式的响应字典
         """
-        import time
-
         candidates = gemini_response.get("candidates", [])
         choices = []
 
@@ -471,15 +501,14 @@ class GeminiToOpenAIConverter:
                     text_parts.append(part["text"])
                 elif "functionCall" in part:
                     func_call = part["functionCall"]
-                    import json
-
+                    name = func_call.get("name", "")
                     tool_calls.append(
                         {
-                            "id": f"call_{func_call.get('name', '')}_{i}",
+                            "id": f"call_{name}_{i}",
                             "type": "function",
                             "function": {
-                                "name": func_call.get("name", ""),
-                                "arguments": json.dumps(func_call.get("args", {})),
+                                "name": name,
+                                "arguments": json_dumps(func_call.get("args", {})).decode("utf-8"),
                             },
                         }
                     )
@@ -508,7 +537,7 @@ class GeminiToOpenAIConverter:
         return {
             "id": f"chatcmpl-{gemini_response.get('modelVersion', 'gemini')}",
             "object": "chat.completion",
-            "created": int(time.time()),
+            "created": int(time.time()) if created is None else created,
             "model": gemini_response.get("modelVersion", "gemini"),
             "choices": choices,
             "usage": usage,
@@ -526,14 +555,7 @@ class GeminiToOpenAIConverter:
 
     def _convert_finish_reason(self, finish_reason: Optional[str]) -> Optional[str]:
         """转换停止原因"""
-        mapping = {
-            "STOP": "stop",
-            "MAX_TOKENS": "length",
-            "SAFETY": "content_filter",
-            "RECITATION": "content_filter",
-            "OTHER": "stop",
-        }
-        return mapping.get(finish_reason, "stop")
+        return _OPENAI_FINISH_REASON_MAP.get(finish_reason, "stop")
 
 
 __all__ = [
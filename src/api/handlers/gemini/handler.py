@@ -6,7 +6,28 @@ Gemini Chat Handler
 
 from typing import Any, Dict, Optional
 
+from pydantic import BaseModel
+
 from src.api.handlers.base.chat_handler_base import ChatHandlerBase
+from src.api.handlers.gemini.converter import ClaudeToGeminiConverter, OpenAIToGeminiConverter
+from src.models.claude import ClaudeMessagesRequest
+from src.models.gemini import GeminiRequest
+from src.models.openai import OpenAIRequest
+
+# 转换器无状态，所有请求共享实例
+_CLAUDE_TO_GEMINI_CONVERTER = ClaudeToGeminiConverter()
+_OPENAI_TO_GEMINI_CONVERTER = OpenAIToGeminiConverter()
+
+
+def _dump_for_conversion(request: BaseModel) -> Dict[str, Any]:
+    """
+    序列化请求模型供转换器使用，跳过值为 None 的顶层字段
+
+    未设置的采样参数、tools 等不再被序列化成 None 再写入 generation_config；
+    嵌套字段（如消息的 content=None）保持原样，转换器依赖其语义。
+    """
+    none_fields = {key for key, value in request.__dict__.items() if value is None}
+    return request.model_dump(exclude=none_fields)
 
 
 class GeminiChatHandler(ChatHandlerBase):
@@ -62,28 +83,18 @@ class GeminiChatHandler(ChatHandlerBase):
         Returns:
             GeminiRequest 对象
         """
-        from src.api.handlers.gemini.converter import (
-            ClaudeToGeminiConverter,
-            OpenAIToGeminiConverter,
-        )
-        from src.models.claude import ClaudeMessagesRequest
-        from src.models.gemini import GeminiRequest
-        from src.models.openai import OpenAIRequest
-
         # 如果已经是 Gemini 格式，直接返回
         if isinstance(request, GeminiRequest):
             return request
 
         # 如果是 Claude 格式，转换为 Gemini 格式
         if isinstance(request, ClaudeMessagesRequest):
-            converter = ClaudeToGeminiConverter()
-            gemini_dict = converter.convert_request(request.model_dump())
+            gemini_dict = _CLAUDE_TO_GEMINI_CONVERTER.convert_request(_dump_for_conversion(request))
             return GeminiRequest(**gemini_dict)
 
         # 如果是 OpenAI 格式，转换为 Gemini 格式
         if isinstance(request, OpenAIRequest):
-            converter = OpenAIToGeminiConverter()
-            gemini_dict = converter.convert_request(request.model_dump())
+            gemini_dict = _OPENAI_TO_GEMINI_CONVERTER.convert_request(_dump_for_conversion(request))
             return GeminiRequest(**gemini_dict)
 
         # 如果是字典，根据内容判断格式并转换
@@ -100,13 +111,11 @@ class GeminiChatHandler(ChatHandlerBase):
                 messages = request.get("messages", [])
                 if messages and isinstance(messages[0].get("content"), list):
                     # 可能是 Claude 格式
-                    converter = ClaudeToGeminiConverter()
-                    gemini_dict = converter.convert_request(request)
+                    gemini_dict = _CLAUDE_TO_GEMINI_CONVERTER.convert_request(request)
                     return GeminiRequest(**gemini_dict)
                 else:
                     # 可能是 OpenAI 格式
-                    converter = OpenAIToGeminiConverter()
-                    gemini_dict = converter.convert_request(request)
+                    gemini_dict = _OPENAI_TO_GEMINI_CONVERTER.convert_request(request)
                     return GeminiRequest(**gemini_dict)
 
             # 默认尝试作为 Gemini 格式
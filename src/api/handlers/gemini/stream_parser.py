@@ -9,9 +9,18 @@ Gemini API 的流式响应格式与 Claude/OpenAI 不同:
 参考: https://ai.google.dev/api/generate-content#method:-models.streamgeneratecontent
 """
 
+import codecs
 import json
+import re
 from typing import Any, Dict, List, Optional
 
+from src.utils.json_utils import JSONDecodeError, json_loads
+
+# raw_decode 从指定位置解析一个完整的 JSON 值并返回结束位置，扫描在 C 层完成
+_DECODER = json.JSONDecoder()
+# 数组元素之间的空白和逗号
+_SEPARATORS_RE = re.compile(r"[\s,]*")
+
 
 class GeminiStreamParser:
     """
@@ -31,17 +40,28 @@ class GeminiStreamParser:
     FINISH_REASON_SAFETY = "SAFETY"
     FINISH_REASON_RECITATION = "RECITATION"
     FINISH_REASON_OTHER = "OTHER"
+    _FINISH_REASONS = frozenset(
+        (
+            FINISH_REASON_STOP,
+            FINISH_REASON_MAX_TOKENS,
+            FINISH_REASON_SAFETY,
+            FINISH_REASON_RECITATION,
+            FINISH_REASON_OTHER,
+        )
+    )
 
     def __init__(self):
+        # 尚未解析完成的文本（只保留最后一个不完整的元素）
         self._buffer = ""
         self._in_array = False
-        self._brace_depth = 0
+        # 增量 UTF-8 解码：多字节字符可能被拆在两个 chunk 之间
+        self._utf8_decoder = codecs.getincrementaldecoder("utf-8")()
 
     def reset(self):
         """重置解析器状态"""
         self._buffer = ""
         self._in_array = False
-        self._brace_depth = 0
+        self._utf8_decoder.reset()
 
     def parse_chunk(self, chunk: bytes | str) -> List[Dict[str, Any]]:
         """
@@ -54,47 +74,45 @@ class GeminiStreamParser:
             解析后的事件列表
         """
         if isinstance(chunk, bytes):
-            text = chunk.decode("utf-8")
+            text = self._utf8_decoder.decode(chunk)
         else:
             text = chunk
 
         events: List[Dict[str, Any]] = []
-
-        for char in text:
-            if char == "[" and not self._in_array:
+        buffer = self._buffer + text if self._buffer else text
+        pos = 0
+        end = len(buffer)
+
+        while pos < end:
+            if not self._in_array:
+                # 数组开始之前的内容忽略
+                start = buffer.find("[", pos)
+                if start == -1:
+                    pos = end
+                    break
                 self._in_array = True
+                pos = start + 1
                 continue
 
-            if char == "]" and self._in_array and self._brace_depth == 0:
+            pos = _SEPARATORS_RE.match(buffer, pos).end()
+            if pos >= end:
+                break
+
+            if buffer[pos] == "]":
                 # 数组结束
                 self._in_array = False
-                if self._buffer.strip():
-                    try:
-                        obj = json.loads(self._buffer.strip().rstrip(","))
-                        events.append(obj)
-                    except json.JSONDecodeError:
-                        pass
-                self._buffer = ""
+                pos += 1
                 continue
 
-            if self._in_array:
-                if char == "{":
-                    self._brace_depth += 1
-                elif char == "}":
-                    self._brace_depth -= 1
-
-                self._buffer += char
-
-                # 当 brace_depth 回到 0 时，说明一个完整的 JSON 对象结束
-                if self._brace_depth == 0 and self._buffer.strip():
-                    try:
-                        obj = json.loads(self._buffer.strip().rstrip(","))
-                        events.append(obj)
-                        self._buffer = ""
-                    except json.JSONDecodeError:
-                        # 可能还不完整，继续累积
-                        pass
+            try:
+                obj, pos = _DECODER.raw_decode(buffer, pos)
+            except JSONDecodeError:
+                # 元素还不完整，保留剩余文本等待后续数据
+                break
+            if isinstance(obj, dict):
+                events.append(obj)
 
+        self._buffer = buffer[pos:]
         return events
 
     def parse_line(self, line: str) -> Optional[Dict[str, Any]]:
@@ -107,14 +125,25 @@ class GeminiStreamParser:
         Returns:
             解析后的事件字典，如果无法解析返回 None
         """
-        if not line or line.strip() in ["[", "]", ","]:
+        if not line:
+            return None
+
+        # 只 strip 一次；数组分隔符行（"[", "]", ","）直接跳过
+        stripped = line.strip()
+        if stripped in ("[", "]", ","):
             return None
 
         try:
-            return json.loads(line.strip().rstrip(","))
-        except json.JSONDecodeError:
+            return json_loads(stripped.rstrip(","))
+        except JSONDecodeError:
             return None
 
+    @staticmethod
+    def _first_candidate(event: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """取第一个 candidate（流式 chunk 通常只有一个），没有时返回 None"""
+        candidates = event.get("candidates")
+        return candidates[0] if candidates else None
+
     def is_done_event(self, event: Dict[str, Any]) -> bool:
         """
         判断是否为结束事件
@@ -125,18 +154,10 @@ class GeminiStreamParser:
         Returns:
             True 如果是结束事件
         """
-        candidates = event.get("candidates", [])
-        if candidates:
-            for candidate in candidates:
-                finish_reason = candidate.get("finishReason")
-                if finish_reason in (
-                    self.FINISH_REASON_STOP,
-                    self.FINISH_REASON_MAX_TOKENS,
-                    self.FINISH_REASON_SAFETY,
-                    self.FINISH_REASON_RECITATION,
-                    self.FINISH_REASON_OTHER,
-                ):
-                    return True
+        finish_reasons = self._FINISH_REASONS
+        for candidate in event.get("candidates") or ():
+            if candidate.get("finishReason") in finish_reasons:
+                return True
         return False
 
     def is_error_event(self, event: Dict[str, Any]) -> bool:
@@ -214,10 +235,8 @@ class GeminiStreamParser:
         Returns:
             结束原因字符串
         """
-        candidates = event.get("candidates", [])
-        if candidates:
-            return candidates[0].get("finishReason")
-        return None
+        candidate = self._first_candidate(event)
+        return candidate.get("finishReason") if candidate is not None else None
 
     def extract_text_delta(self, event: Dict[str, Any]) -> Optional[str]:
         """
@@ -229,18 +248,17 @@ class GeminiStreamParser:
         Returns:
             文本内容，如果没有文本返回 None
         """
-        candidates = event.get("candidates", [])
-        if not candidates:
+        candidate = self._first_candidate(event)
+        if candidate is None:
             return None
 
-        content = candidates[0].get("content", {})
-        parts = content.get("parts", [])
+        parts = candidate.get("content", {}).get("parts", [])
 
-        text_parts = []
-        for part in parts:
-            if "text" in part:
-                text_parts.append(part["text"])
+        # 流式 chunk 通常只有一个 part，直接返回，不构建列表再 join
+        if len(parts) == 1:
+            return parts[0].get("text")
 
+        text_parts = [part["text"] for part in parts if "text" in part]
         return "".join(text_parts) if text_parts else None
 
     def extract_usage(self, event: Dict[str, Any]) -> Optional[Dict[str, int]]:
@@ -297,11 +315,8 @@ class GeminiStreamParser:
         Returns:
             安全评级列表，如果没有返回 None
         """
-        candidates = event.get("candidates", [])
-        if not candidates:
-            return None
-
-        return candidates[0].get("safetyRatings")
+        candidate = self._first_candidate(event)
+        return candidate.get("safetyRatings") if candidate is not None else None
 
 
 __all__ = ["GeminiStreamParser"]
@@ -4,12 +4,15 @@ Gemini CLI Adapter - 基于通用 CLI Adapter 基类的实现
 继承 CliAdapterBase，处理 Gemini CLI 格式的请求。
 """
 
+from collections import Counter
+from functools import lru_cache
 from typing import Any, Dict, Optional, Type
 
 from fastapi import Request
 
 from src.api.handlers.base.cli_adapter_base import CliAdapterBase, register_cli_adapter
 from src.api.handlers.base.cli_handler_base import CliMessageHandlerBase
+from src.utils.request_utils import get_bearer_token
 
 
 @register_cli_adapter
@@ -50,9 +53,9 @@ class GeminiCliAdapter(CliAdapterBase):
         if query_key:
             return query_key
 
-        authorization = request.headers.get("authorization")
-        if authorization and authorization.lower().startswith("bearer "):
-            return authorization[7:].strip() or None
+        bearer_token = get_bearer_token(request)
+        if bearer_token:
+            return bearer_token
 
         return request.headers.get("x-api-key")
 
@@ -94,10 +97,12 @@ class GeminiCliAdapter(CliAdapterBase):
         contents = payload.get("contents", [])
         generation_config = payload.get("generation_config", {}) or {}
 
-        role_counts: Dict[str, int] = {}
-        for content in contents:
-            role = content.get("role", "unknown") if isinstance(content, dict) else "unknown"
-            role_counts[role] = role_counts.get(role, 0) + 1
+        role_counts: Dict[str, int] = dict(
+            Counter(
+                content.get("role", "unknown") if isinstance(content, dict) else "unknown"
+                for content in contents
+            )
+        )
 
         return {
             "action": "gemini_cli_request",
@@ -115,10 +120,13 @@ class GeminiCliAdapter(CliAdapterBase):
         }
 
 
+@lru_cache(maxsize=8)
 def build_gemini_cli_adapter(x_app_header: str = "") -> GeminiCliAdapter:
     """
     构建 Gemini CLI 适配器
 
+    适配器不持有请求级状态，按请求头缓存实例。
+
     Args:
         x_app_header: X-App 请求头值（预留扩展）
 
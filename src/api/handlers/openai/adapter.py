@@ -4,6 +4,8 @@ OpenAI Chat Adapter - 基于 ChatAdapterBase 的 OpenAI Chat API 适配器
 处理 /v1/chat/completions 端点的 OpenAI Chat 格式请求。
 """
 
+from collections import Counter
+from operator import attrgetter
 from typing import Any, Dict, Optional, Type
 
 from fastapi import Request
@@ -11,8 +13,14 @@ from fastapi.responses import JSONResponse
 
 from src.api.handlers.base.chat_adapter_base import ChatAdapterBase, register_adapter
 from src.api.handlers.base.chat_handler_base import ChatHandlerBase
+from src.api.handlers.base.validation_cache import validate_cache_key
+from src.core.cache_utils import SyncLRUCache
 from src.core.logger import logger
 from src.models.openai import OpenAIRequest
+from src.utils.request_utils import get_bearer_token
+
+# 校验结果缓存，键见 validate_cache_key（缓存的请求对象跨请求共享，只读）
+_VALIDATED_REQUEST_CACHE = SyncLRUCache(max_size=1024, ttl=300)
 
 
 @register_adapter
@@ -38,10 +46,7 @@ class OpenAIChatAdapter(ChatAdapterBase):
 
     def extract_api_key(self, request: Request) -> Optional[str]:
         """从请求中提取 API 密钥 (Authorization: Bearer)"""
-        authorization = request.headers.get("authorization")
-        if authorization and authorization.startswith("Bearer "):
-            return authorization.replace("Bearer ", "")
-        return None
+        return get_bearer_token(request)
 
     def _validate_request_body(self, original_request_body: dict, path_params: dict = None):
         """验证请求体"""
@@ -60,7 +65,13 @@ class OpenAIChatAdapter(ChatAdapterBase):
             )
 
         try:
-            return OpenAIRequest.model_validate(original_request_body, strict=False)
+            cache_key = validate_cache_key(original_request_body)
+            request = _VALIDATED_REQUEST_CACHE.get(cache_key) if cache_key else None
+            if request is None:
+                request = OpenAIRequest.model_validate(original_request_body, strict=False)
+                if cache_key:
+                    _VALIDATED_REQUEST_CACHE.set(cache_key, request)
+            return request
         except ValueError as e:
             return self._error_response(400, str(e), "invalid_request_error")
         except Exception as e:
@@ -74,9 +85,7 @@ class OpenAIChatAdapter(ChatAdapterBase):
 
     def _build_audit_metadata(self, payload: Dict[str, Any], request_obj) -> Dict[str, Any]:
         """构建 OpenAI Chat 特定的审计元数据"""
-        role_counts = {}
-        for message in request_obj.messages:
-            role_counts[message.role] = role_counts.get(message.role, 0) + 1
+        role_counts = dict(Counter(map(attrgetter("role"), request_obj.messages)))
 
         return {
             "action": "openai_chat_completion",
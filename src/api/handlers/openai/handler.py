@@ -59,9 +59,7 @@ class OpenAIChatHandler(ChatHandlerBase):
         Returns:
             更新了 model 字段的请求体
         """
-        result = dict(request_body)
-        result["model"] = mapped_model
-        return result
+        return self.build_provider_payload(request_body, mapped_model=mapped_model)
 
     async def _convert_request(self, request):
         """
@@ -9,6 +9,8 @@ from __future__ import annotations
 import json
 from typing import Any, Dict, List, Optional
 
+from src.utils.json_utils import JSONDecodeError, json_loads
+
 
 class OpenAIStreamParser:
     """
@@ -78,8 +80,8 @@ class OpenAIStreamParser:
             return None
 
         try:
-            return json.loads(line)
-        except json.JSONDecodeError:
+            return json_loads(line)
+        except JSONDecodeError:
             return None
 
     def is_done_chunk(self, chunk: Dict[str, Any]) -> bool:
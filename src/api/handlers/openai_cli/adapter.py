@@ -10,6 +10,7 @@ from fastapi import Request
 
 from src.api.handlers.base.cli_adapter_base import CliAdapterBase, register_cli_adapter
 from src.api.handlers.base.cli_handler_base import CliMessageHandlerBase
+from src.utils.request_utils import get_bearer_token
 
 
 @register_cli_adapter
@@ -35,10 +36,7 @@ class OpenAICliAdapter(CliAdapterBase):
 
     def extract_api_key(self, request: Request) -> Optional[str]:
         """从请求中提取 API 密钥 (Authorization: Bearer)"""
-        authorization = request.headers.get("authorization")
-        if authorization and authorization.startswith("Bearer "):
-            return authorization.replace("Bearer ", "")
-        return None
+        return get_bearer_token(request)
 
 
 __all__ = ["OpenAICliAdapter"]
@@ -65,9 +65,7 @@ class OpenAICliMessageHandler(CliMessageHandlerBase):
         Returns:
             更新了 model 字段的请求体
         """
-        result = dict(request_body)
-        result["model"] = mapped_model
-        return result
+        return self.build_provider_payload(request_body, mapped_model=mapped_model)
 
     def _process_event_data(
         self,
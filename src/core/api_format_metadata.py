@@ -165,9 +165,10 @@ def get_local_path(api_format: APIFormat) -> str:
     return "/"
 
 
+@lru_cache(maxsize=None)
 def get_auth_config(api_format: APIFormat) -> tuple[str, str]:
     """
-    获取该格式的认证配置。
+    获取该格式的认证配置（格式定义不可变，结果按格式缓存）。
 
     Returns:
         (auth_header, auth_type) 元组
@@ -10,6 +10,7 @@
 
 import base64
 import hashlib
+from functools import lru_cache
 
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes
@@ -164,3 +165,15 @@ class CryptoService:
 
 # 创建全局加密服务实例
 crypto_service = CryptoService()
+
+
+@lru_cache(maxsize=1024)
+def decrypt_cached(ciphertext: str) -> str:
+    """
+    带缓存的解密，用于每个上游请求都要解密 Provider Key 的热路径
+
+    以密文为缓存键：Key 被修改或轮换后密文随之变化，自然不会命中旧值。
+    解密失败会抛出 DecryptionException，不会被缓存。
+    如需立即丢弃已缓存的明文，调用 decrypt_cached.cache_clear()。
+    """
+    return crypto_service.decrypt(ciphertext)
@@ -2,7 +2,7 @@
 优化工具类 - 包含Token计数和响应头管理
 """
 
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 import tiktoken
 
@@ -56,27 +56,43 @@ class TokenCounter:
             # 降级到简单估算
             return len(text) // 4
 
+    def count_tokens_batch(self, texts: List[str], model: str = "claude-3") -> int:
+        """
+        计算多段文本的token总数（只查找一次编码器）
+        """
+        texts = [text for text in texts if text]
+        if not texts:
+            return 0
+
+        try:
+            encoding = self._get_encoding(model)
+            return sum(len(encoding.encode(text)) for text in texts)
+        except Exception:
+            # 降级到逐段计数（各段单独估算）
+            return sum(self.count_tokens(text, model) for text in texts)
+
     def count_messages_tokens(self, messages: list, model: str = "claude-3") -> int:
         """
         计算消息列表的总token数
         """
         total = 0
+        texts: List[str] = []
         for message in messages:
             if isinstance(message, dict):
                 # 计算角色标记
                 total += 4  # 角色和分隔符的开销
 
-                # 计算内容
+                # 收集内容，最后统一计数
                 content = message.get("content", "")
                 if isinstance(content, str):
-                    total += self.count_tokens(content, model)
+                    texts.append(content)
                 elif isinstance(content, list):
                     # 处理多模态内容
                     for item in content:
                         if isinstance(item, dict) and "text" in item:
-                            total += self.count_tokens(item["text"], model)
+                            texts.append(item["text"])
 
-        return total
+        return total + self.count_tokens_batch(texts, model)
 
     def estimate_response_tokens(self, response: Any, model: str = "claude-3") -> int:
         """
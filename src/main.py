@@ -154,6 +154,12 @@ async def lifespan(app: FastAPI):
     await init_batch_committer()
     logger.info("[OK] 批量提交器已启动，数据库写入性能优化已启用")
 
+    # 初始化流式遥测队列（流结束后的统计写入交给后台 worker）
+    logger.info("初始化流式遥测队列...")
+    from src.api.handlers.base.stream_telemetry import init_stream_telemetry_queue
+
+    await init_stream_telemetry_queue()
+
     # 初始化插件系统
     logger.info("初始化插件系统...")
     plugin_manager = get_plugin_manager()
@@ -167,6 +173,11 @@ async def lifespan(app: FastAPI):
 
     register_all_converters()
 
+    # 预热响应解析器（避免首个请求承担解析器初始化开销）
+    from src.api.handlers.base.parsers import warm_parsers
+
+    warm_parsers()
+
     logger.info(f"服务启动成功: http://{config.host}:{config.port}")
     logger.info("=" * 60)
 
@@ -208,6 +219,12 @@ async def lifespan(app: FastAPI):
     # 关闭时执行
     logger.info("正在关闭服务...")
 
+    # 停止流式遥测队列（先写完待处理的统计记录，再停止批量提交器）
+    logger.info("停止流式遥测队列...")
+    from src.api.handlers.base.stream_telemetry import shutdown_stream_telemetry_queue
+
+    await shutdown_stream_telemetry_queue()
+
     # 停止批量提交器（确保所有待提交的数据都被保存）
     logger.info("停止批量提交器...")
     from src.core.batch_committer import shutdown_batch_committer
@@ -309,6 +309,11 @@ class GeminiRequest(BaseModelWithExtras):
     """
 
     model: Optional[str] = Field(default=None, description="模型名称，从 URL 路径提取（内部使用）")
+    # 声明为字段：校验后赋值走普通字段路径，比写入额外属性（__pydantic_extra__）快得多。
+    # 类型用 Any：客户端请求体中的 stream 与以前一样不参与校验（随后被 URL 端点决定的值覆盖）
+    stream: Any = Field(
+        default=False, exclude=True, description="是否流式，由 URL 端点决定（内部使用）"
+    )
     contents: List[GeminiContent]
     system_instruction: Optional[GeminiSystemInstruction] = Field(
         default=None, alias="systemInstruction"
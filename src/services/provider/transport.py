@@ -6,15 +6,37 @@
 - 根据 API 格式或端点配置生成请求 URL
 """
 
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 from urllib.parse import urlencode
 
 from src.core.api_format_metadata import get_auth_config, get_default_path, resolve_api_format
-from src.core.crypto import crypto_service
+from src.core.crypto import decrypt_cached
 from src.core.enums import APIFormat
 from src.core.logger import logger
 
 
+def _auth_config_for(api_format: Any) -> Tuple[str, str]:
+    """按 endpoint.api_format 原始值取认证头配置（get_auth_config 已按格式缓存）"""
+    resolved_format = resolve_api_format(api_format)
+    return get_auth_config(resolved_format) if resolved_format else ("Authorization", "bearer")
+
+
+def build_auth_headers(endpoint: Any, key: Any) -> Dict[str, str]:
+    """
+    构建认证头 + endpoint 配置的额外头部（后者可覆盖认证头）
+
+    endpoint 是随会话加载、可被管理接口原地修改的 ORM 对象，
+    因此不缓存其 headers 快照，只在一次字典构造中完成合并。
+    """
+    auth_header, auth_type = _auth_config_for(getattr(endpoint, "api_format", None))
+    decrypted_key = decrypt_cached(key.api_key)
+    auth_value = f"Bearer {decrypted_key}" if auth_type == "bearer" else decrypted_key
+
+    endpoint_headers = endpoint.headers
+    if endpoint_headers:
+        return {auth_header: auth_value, **endpoint_headers}
+    return {auth_header: auth_value}
+
 
 def build_provider_headers(
     endpoint,
@@ -26,24 +48,8 @@ def build_provider_headers(
     """
     根据 endpoint/key 构建请求头，并透传客户端自定义头。
     """
-    headers: Dict[str, str] = {}
-
-    decrypted_key = crypto_service.decrypt(key.api_key)
-
-    # 根据 API 格式自动选择认证头
-    api_format = getattr(endpoint, "api_format", None)
-    resolved_format = resolve_api_format(api_format)
-    auth_header, auth_type = (
-        get_auth_config(resolved_format) if resolved_format else ("Authorization", "bearer")
-    )
-
-    if auth_type == "bearer":
-        headers[auth_header] = f"Bearer {decrypted_key}"
-    else:
-        headers[auth_header] = decrypted_key
-
-    if endpoint.headers:
-        headers.update(endpoint.headers)
+    # 根据 API 格式自动选择认证头，并合并 endpoint 额外头部
+    headers = build_auth_headers(endpoint, key)
 
     excluded_headers = {
         "host",
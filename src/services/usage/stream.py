@@ -5,12 +5,12 @@
 
 import json
 import re
-from typing import Any, AsyncIterator, Dict, Optional, Tuple
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
 from sqlalchemy.orm import Session
 
 from src.api.handlers.base.parsers import get_parser_for_format
-from src.api.handlers.base.response_parser import StreamStats
+from src.api.handlers.base.response_parser import ParsedChunk, StreamStats
 from src.core.exceptions import EmptyStreamException
 from src.core.logger import logger
 from src.database.database import create_session
@@ -320,6 +320,32 @@ class StreamUsageTracker:
         if chunk is None:
             return None, None
 
+        return self._consume_parsed_chunk(chunk)
+
+    def _parse_sse_lines(self, lines: List[str]) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        批量解析一次读取到的完整 SSE 行
+
+        Returns:
+            (拼接后的内容文本, 最后一个 usage 信息)
+        """
+        content_parts: List[str] = []
+        final_usage = None
+        chunks = self.response_parser.parse_sse_lines(
+            [line.rstrip("\r") for line in lines], self.stream_stats
+        )
+        for chunk in chunks:
+            content, usage = self._consume_parsed_chunk(chunk)
+            if content:
+                content_parts.append(content)
+            if usage:
+                final_usage = usage
+        return "".join(content_parts), final_usage
+
+    def _consume_parsed_chunk(
+        self, chunk: ParsedChunk
+    ) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """根据解析后的数据块更新完整响应，并返回 (内容文本, 使用信息)"""
         # 从 ParsedChunk 中提取内容和使用信息
         content = chunk.text_delta
 
@@ -389,13 +415,10 @@ class StreamUsageTracker:
             self.current_line = lines[-1]
 
             # 处理完整的行
-            for line in lines[:-1]:
-                line = line.rstrip("\r")
-                content, usage = self.parse_sse_line(line)
-                if content:
-                    total_content += content
-                if usage:
-                    final_usage = usage
+            content, usage = self._parse_sse_lines(lines[:-1])
+            total_content += content
+            if usage:
+                final_usage = usage
 
         except UnicodeDecodeError:
             # 如果解码失败，说明缓冲区中有不完整的UTF-8序列
@@ -412,13 +435,10 @@ class StreamUsageTracker:
                     lines = self.current_line.split("\n")
                     self.current_line = lines[-1]
 
-                    for line in lines[:-1]:
-                        line = line.rstrip("\r")
-                        content, usage = self.parse_sse_line(line)
-                        if content:
-                            total_content += content
-                        if usage:
-                            final_usage = usage
+                    content, usage = self._parse_sse_lines(lines[:-1])
+                    total_content += content
+                    if usage:
+                        final_usage = usage
                     break
                 except UnicodeDecodeError:
                     continue
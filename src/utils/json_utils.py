@@ -0,0 +1,56 @@
+"""
+JSON 解析工具
+
+流式响应的每个 SSE 事件都要做一次 JSON 解析，这里优先使用 orjson（可选依赖），
+未安装时回退到标准库 json，调用方无需关心具体实现。
+"""
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson 为可选依赖
+    orjson = None
+
+# orjson.JSONDecodeError 是 json.JSONDecodeError 的子类，调用方统一捕获这一个即可
+JSONDecodeError = json.JSONDecodeError
+
+
+def json_loads(data: Union[str, bytes, bytearray]) -> Any:
+    """
+    解析 JSON 文本（str 或 UTF-8 bytes）
+
+    orjson 比标准库更严格（例如不接受 NaN/Infinity、超出 64 位的整数），
+    解析失败时回退到标准库，保证两者接受的输入一致。
+
+    Raises:
+        JSONDecodeError: 输入不是合法 JSON
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
+
+def json_dumps(data: Any) -> bytes:
+    """
+    序列化为紧凑的 UTF-8 JSON bytes
+
+    同一进程内相同输入的输出稳定，可用于计算缓存键；
+    orjson 无法处理的输入（如超出 64 位的整数）回退到标准库。
+
+    Raises:
+        TypeError: 输入包含无法序列化的对象
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(data)
+        except TypeError:
+            pass
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+__all__ = ["JSONDecodeError", "json_dumps", "json_loads"]
@@ -56,6 +56,24 @@ def get_user_agent(request: Request) -> str:
     return request.headers.get("User-Agent", "unknown")
 
 
+def get_bearer_token(request: Request) -> Optional[str]:
+    """
+    获取 Authorization: Bearer 头中的令牌
+
+    认证方案名大小写不敏感（RFC 7235），令牌去除首尾空白。
+
+    Args:
+        request: FastAPI Request 对象
+
+    Returns:
+        Optional[str]: 令牌，如果没有 Bearer 认证头或令牌为空则返回 None
+    """
+    authorization = request.headers.get("authorization")
+    if authorization and authorization[:7].lower() == "bearer ":
+        return authorization[7:].strip() or None
+    return None
+
+
 def get_request_id(request: Request) -> Optional[str]:
     """
     获取请求ID（如果存在）
@@ -1,109 +1,104 @@
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# 绝大多数行不会结束一个事件，直接返回这个共享的空结果，避免每行分配一个列表
+_NO_EVENTS: Tuple[Dict[str, Optional[str]], ...] = ()
 
 
 class SSEEventParser:
-    """轻量SSE解析器，按行接收输入并输出完整事件。"""
+    """
+    轻量SSE解析器，按行接收输入并输出完整事件。
 
-    def __init__(self) -> None:
-        self._reset_buffer()
+    feed_line 返回的事件 dict 由解析器复用（每个事件原地改写同一个对象），
+    只在下一次调用 feed_line 之前有效；需要保留事件的调用方请自行 dict(event) 复制。
+    flush 返回的事件是独立的新对象。
+    """
 
-    def _reset_buffer(self) -> None:
-        self._buffer: Dict[str, Optional[str] | List[str]] = {
+    def __init__(self) -> None:
+        self._event_name: Optional[str] = None
+        self._data_lines: List[str] = []
+        self._id: Optional[str] = None
+        self._retry: Optional[str] = None
+        self._event: Dict[str, Optional[str]] = {
             "event": None,
-            "data": [],
+            "data": None,
             "id": None,
             "retry": None,
         }
 
+    def _reset_buffer(self) -> None:
+        self._event_name = None
+        self._data_lines.clear()
+        self._id = None
+        self._retry = None
+
     def _finalize_event(self) -> Optional[Dict[str, Optional[str]]]:
-        data_lines = self._buffer.get("data", [])
-        if not data_lines:
+        if not self._data_lines:
             self._reset_buffer()
             return None
 
-        data_str = "\n".join(data_lines)
-        event = {
-            "event": self._buffer.get("event"),
-            "data": data_str,
-            "id": self._buffer.get("id"),
-            "retry": self._buffer.get("retry"),
-        }
+        event = self._event
+        event["event"] = self._event_name
+        event["data"] = "\n".join(self._data_lines)
+        event["id"] = self._id
+        event["retry"] = self._retry
 
         self._reset_buffer()
         return event
 
-    def feed_line(self, line: Optional[str]) -> List[Dict[str, Optional[str]]]:
-        """处理单行SSE文本，返回所有完成的事件。"""
+    def _finalized_events(self) -> Sequence[Dict[str, Optional[str]]]:
+        event = self._finalize_event()
+        return (event,) if event else _NO_EVENTS
+
+    def feed_line(self, line: Optional[str]) -> Sequence[Dict[str, Optional[str]]]:
+        """处理单行SSE文本，返回所有完成的事件（事件 dict 会被复用，见类说明）。"""
 
         normalized_line = (line or "").rstrip("\r")
-        events: List[Dict[str, Optional[str]]] = []
 
         # 空行表示事件结束
         if normalized_line == "":
-            event = self._finalize_event()
-            if event:
-                events.append(event)
-            return events
+            return self._finalized_events()
 
         # 注释行直接忽略
         if normalized_line.startswith(":") and not normalized_line.startswith("::"):
+            return _NO_EVENTS
+
+        if normalized_line.startswith("data:"):
+            # 如果已经有缓存的 data，先完成上一个事件
+            # 这样可以处理没有空行分隔的连续 data 行
+            events = self._finalized_events() if self._data_lines else _NO_EVENTS
+
+            rest = normalized_line[5:]
+            self._data_lines.append(rest[1:] if rest.startswith(" ") else rest)
             return events
 
         if normalized_line.startswith("event:"):
-            _, rest = normalized_line.split(":", 1)
-            value = rest.lstrip()
+            value = normalized_line[6:].lstrip()
 
             if " data:" in value:
                 event_part, data_part = value.split("data:", 1)
-                event_name = event_part.strip() or None
+                self._event_name = event_part.strip() or None
                 data_value = data_part.lstrip()
-                self._buffer["event"] = event_name
                 if data_value:
-                    self._append_data_line(data_value)
-                event = self._finalize_event()
-                if event:
-                    events.append(event)
-            else:
-                event_name = value.strip() or None
-                self._buffer["event"] = event_name
-            return events
+                    self._data_lines.append(data_value)
+                return self._finalized_events()
 
-        if normalized_line.startswith("data:"):
-            # 如果已经有缓存的 data，先完成上一个事件
-            # 这样可以处理没有空行分隔的连续 data 行
-            existing_data = self._buffer.get("data", [])
-            if existing_data and len(existing_data) > 0:
-                event = self._finalize_event()
-                if event:
-                    events.append(event)
-
-            _, rest = normalized_line.split(":", 1)
-            self._append_data_line(rest[1:] if rest.startswith(" ") else rest)
-            return events
+            self._event_name = value.strip() or None
+            return _NO_EVENTS
 
         if normalized_line.startswith("id:"):
-            _, rest = normalized_line.split(":", 1)
-            self._buffer["id"] = rest.strip() or None
-            return events
+            self._id = normalized_line[3:].strip() or None
+            return _NO_EVENTS
 
         if normalized_line.startswith("retry:"):
-            _, rest = normalized_line.split(":", 1)
-            self._buffer["retry"] = rest.strip() or None
-            return events
+            self._retry = normalized_line[6:].strip() or None
+            return _NO_EVENTS
 
         # 未知行：视作数据追加（部分实现会缺少 data: 前缀）
-        self._append_data_line(normalized_line)
-        return events
+        self._data_lines.append(normalized_line)
+        return _NO_EVENTS
 
     def flush(self) -> List[Dict[str, Optional[str]]]:
-        """在流结束时调用，输出尚未完成的事件。"""
+        """在流结束时调用，输出尚未完成的事件（返回独立的事件对象）。"""
 
         event = self._finalize_event()
-        return [event] if event else []
-
-    def _append_data_line(self, value: str) -> None:
-        data_lines = self._buffer.get("data")
-        if isinstance(data_lines, list):
-            data_lines.append(value)
-        else:
-            self._buffer["data"] = [value]
+        return [dict(event)] if event else []
@@ -77,3 +77,39 @@ def test_get_log_summary_includes_ttfb_when_present() -> None:
     assert "TTFB: 123ms" in summary
     assert "Total: 456ms" in summary
 
+
+def test_add_parsed_chunk_stops_after_size_limit() -> None:
+    ctx = StreamContext(model="m", api_format="f", collect_chunks=True, max_parsed_chunks_size=10)
+
+    ctx.add_parsed_chunk({"a": 1}, 6)
+    ctx.add_parsed_chunk({"b": 2}, 6)
+    ctx.add_parsed_chunk({"c": 3}, 6)
+
+    assert ctx.parsed_chunks == [{"a": 1}, {"b": 2}]
+
+
+def test_build_telemetry_events_from_context() -> None:
+    ctx = StreamContext(model="claude-3", api_format="CLAUDE")
+    ctx.update_provider_info("anthropic", "p1", "e1", "k1")
+    ctx.update_usage(input_tokens=10, output_tokens=5, cached_tokens=2)
+    ctx.mapped_model = "claude-3-5"
+
+    success = ctx.build_telemetry_success(
+        request_headers={"h": "1"},
+        request_body={"b": 1},
+        response_body={"chunks": []},
+        response_time_ms=120,
+    )
+    assert success.provider == "anthropic"
+    assert (success.input_tokens, success.output_tokens, success.cache_read_tokens) == (10, 5, 2)
+    assert success.provider_endpoint_id == "e1"
+    assert success.target_model == "claude-3-5"
+    assert success.is_stream is True
+    assert success.response_metadata is None
+
+    ctx.mark_failed(499, "client disconnected")
+    failure = ctx.build_telemetry_failure(request_headers={}, request_body={}, response_time_ms=80)
+    assert failure.status_code == 499
+    assert failure.error_message == "client disconnected"
+    assert failure.input_tokens == 10
+    assert failure.response_body is None
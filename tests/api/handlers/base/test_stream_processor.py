@@ -1,25 +1,229 @@
-from src.api.handlers.base.parsers import OpenAIResponseParser
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.api.handlers.base.parsers import GeminiResponseParser, OpenAIResponseParser
 from src.api.handlers.base.stream_context import StreamContext
-from src.api.handlers.base.stream_processor import StreamProcessor
+from src.api.handlers.base.stream_processor import StreamProcessor, _split_complete_lines
+from src.core.exceptions import EmbeddedErrorException
 from src.utils.sse_parser import SSEEventParser
 
 
 def test_process_line_parses_sse_and_updates_context() -> None:
     ctx = StreamContext(model="gpt-4o", api_format="OPENAI")
-    processor = StreamProcessor(request_id="req_1", default_parser=OpenAIResponseParser(), collect_text=True)
+    processor = StreamProcessor(
+        request_id="req_1", default_parser=OpenAIResponseParser(), collect_text=True
+    )
     sse_parser = SSEEventParser()
 
-    processor._process_line(ctx, sse_parser, 'data: {"choices": [{"delta": {"content": "hi"}}]}\r\n')
+    processor._process_line_bytes(
+        ctx, sse_parser, b'data: {"choices": [{"delta": {"content": "hi"}}]}\r'
+    )
     assert ctx.chunk_count == 1
     assert ctx.data_count == 0
 
-    processor._process_line(ctx, sse_parser, "")
+    processor._process_line_bytes(ctx, sse_parser, b"")
     assert ctx.data_count == 1
     assert ctx.collected_text == "hi"
 
-    processor._process_line(ctx, sse_parser, 'data: {"usage": {"input_tokens": 7, "output_tokens": 8}}\n')
-    processor._process_line(ctx, sse_parser, "")
+    processor._process_line_bytes(ctx, sse_parser, b": ping")
+    processor._process_line_bytes(
+        ctx, sse_parser, b'data: {"usage": {"input_tokens": 7, "output_tokens": 8}}'
+    )
+    processor._process_line_bytes(ctx, sse_parser, b"")
 
     assert ctx.input_tokens == 7
     assert ctx.output_tokens == 8
 
+
+def test_parsed_chunks_only_kept_when_collect_chunks_enabled() -> None:
+    processor = StreamProcessor(request_id="req_1", default_parser=OpenAIResponseParser())
+    line = '{"choices": [{"delta": {"content": "hi"}}]}'
+
+    ctx = StreamContext(model="gpt-4o", api_format="OPENAI")
+    processor.handle_sse_event(ctx, None, line)
+    assert ctx.parsed_chunks == []
+
+    ctx = StreamContext(model="gpt-4o", api_format="OPENAI", collect_chunks=True)
+    processor.handle_sse_event(ctx, None, line)
+    assert len(ctx.parsed_chunks) == 1
+    assert ctx.build_response_body(0)["metadata"]["total_chunks"] == 1
+
+
+def test_split_complete_lines_keeps_partial_line_in_buffer() -> None:
+    buffer = bytearray()
+
+    assert _split_complete_lines(buffer, b"data: a") == []
+    assert _split_complete_lines(buffer, b"bc\r\n\ndata: ") == [b"data: abc\r", b""]
+    assert buffer == bytearray(b"data: ")
+    assert _split_complete_lines(buffer, b"x\n") == [b"data: x"]
+    assert buffer == bytearray()
+    assert _split_complete_lines(buffer, b"data: y\n\ndata: z") == [b"data: y", b""]
+    assert buffer == bytearray(b"data: z")
+
+
+def test_handle_sse_event_only_parses_usage_or_completion_events_when_not_collecting() -> None:
+    processor = StreamProcessor(request_id="req_1", default_parser=OpenAIResponseParser())
+    ctx = StreamContext(model="gpt-4o", api_format="OPENAI")
+
+    processor.handle_sse_event(ctx, None, '{"choices": [{"delta": {"content": "hi"}}]}')
+    processor.handle_sse_event(ctx, None, '{"usage": {"prompt_tokens": 3, "completion_tokens": 4}}')
+    processor.handle_sse_event(ctx, None, '{"type": "message_stop"}')
+
+    # 被跳过的文本增量事件没有解析，不计入 data_count
+    assert ctx.data_count == 2
+    assert ctx.collected_text == ""
+    assert ctx.input_tokens == 3
+    assert ctx.output_tokens == 4
+    assert ctx.has_completion is True
+
+
+def test_process_line_bytes_decodes_each_line_independently() -> None:
+    ctx = StreamContext(model="gpt-4o", api_format="OPENAI")
+    processor = StreamProcessor(
+        request_id="req_1", default_parser=OpenAIResponseParser(), collect_text=True
+    )
+    sse_parser = SSEEventParser()
+
+    line = 'data: {"choices": [{"delta": {"content": "你好"}}]}\r'.encode("utf-8")
+    processor._process_line_bytes(ctx, sse_parser, line)
+    processor._process_line_bytes(ctx, sse_parser, b"")
+
+    assert ctx.chunk_count == 1
+    assert ctx.collected_text == "你好"
+
+
+async def test_monitored_stream_stops_after_client_disconnects(monkeypatch) -> None:
+    monkeypatch.setattr("src.api.handlers.base.stream_processor._DISCONNECT_CHECK_INTERVAL_S", 0.01)
+    processor = StreamProcessor(request_id="req_1", default_parser=OpenAIResponseParser())
+    ctx = StreamContext(model="gpt-4o", api_format="OPENAI")
+
+    upstream_closed = []
+
+    async def upstream():
+        try:
+            for i in range(100):
+                await asyncio.sleep(0.005)
+                yield b"chunk"
+        finally:
+            upstream_closed.append(True)
+
+    async def is_disconnected() -> bool:
+        return True
+
+    received = [
+        chunk async for chunk in processor.create_monitored_stream(ctx, upstream(), is_disconnected)
+    ]
+
+    assert 0 < len(received) < 100
+    assert ctx.status_code == 499
+    assert upstream_closed == [True]
+
+
+async def test_monitored_stream_fails_when_disconnect_check_raises(monkeypatch) -> None:
+    monkeypatch.setattr("src.api.handlers.base.stream_processor._DISCONNECT_CHECK_INTERVAL_S", 0.01)
+    processor = StreamProcessor(request_id="req_1", default_parser=OpenAIResponseParser())
+    ctx = StreamContext(model="gpt-4o", api_format="OPENAI")
+
+    async def upstream():
+        for _ in range(100):
+            await asyncio.sleep(0.005)
+            yield b"chunk"
+
+    async def is_disconnected() -> bool:
+        raise RuntimeError("receive failed")
+
+    received = []
+    with pytest.raises(RuntimeError, match="receive failed"):
+        async for chunk in processor.create_monitored_stream(ctx, upstream(), is_disconnected):
+            received.append(chunk)
+
+    assert 0 < len(received) < 100
+    assert ctx.status_code == 500
+    assert ctx.error_message == "receive failed"
+
+
+async def test_prefetch_raises_on_embedded_error_and_keeps_chunks_otherwise() -> None:
+    processor = StreamProcessor(request_id="req_1", default_parser=OpenAIResponseParser())
+    provider = SimpleNamespace(name="p")
+
+    async def upstream(*chunks: bytes):
+        for chunk in chunks:
+            yield chunk
+
+    ctx = StreamContext(model="gpt-4o", api_format="OPENAI")
+    with pytest.raises(EmbeddedErrorException):
+        await processor.prefetch_and_check_error(
+            upstream(b': ping\r\n\r\ndata: {"error": {"message": "bad", "type": "429"}}\r\n'),
+            provider,
+            None,
+            ctx,
+        )
+
+    ctx = StreamContext(model="gpt-4o", api_format="OPENAI")
+    chunks = (b'data: {"choices": [{"delta": {"content": "h', b'i"}}]}\n\n', b"data: [DONE]\n")
+    prefetched = await processor.prefetch_and_check_error(upstream(*chunks), provider, None, ctx)
+    assert prefetched == list(chunks[:2])
+
+
+def test_handle_sse_event_scans_only_gemini_usage_metadata() -> None:
+    processor = StreamProcessor(request_id="req_1", default_parser=GeminiResponseParser())
+    ctx = StreamContext(model="gemini-2.5-pro", api_format="GEMINI")
+
+    processor.handle_sse_event(
+        ctx,
+        None,
+        '{"candidates": [{"content": {"parts": [{"text": "say \\"usageMetadata\\": {}"}]}}], '
+        '"usageMetadata": {"promptTokenCount": 5, "candidatesTokenCount": 7, '
+        '"totalTokenCount": 12, '
+        '"promptTokensDetails": [{"modality": "TEXT", "tokenCount": 5}]}}',
+    )
+
+    assert ctx.data_count == 1
+    assert ctx.input_tokens == 5
+    assert ctx.output_tokens == 7
+
+
+async def test_create_response_stream_forwards_prefetched_then_live_chunks() -> None:
+    started = []
+    processor = StreamProcessor(
+        request_id="req_1",
+        default_parser=OpenAIResponseParser(),
+        on_streaming_start=lambda: started.append(True),
+        collect_text=True,
+    )
+    ctx = StreamContext(model="gpt-4o", api_format="OPENAI")
+
+    async def live():
+        yield b'lo"}}]}\n\n'
+        yield b"data: [DONE]\n\n"
+
+    class _Closable:
+        async def __aexit__(self, *args) -> None:
+            pass
+
+        async def aclose(self) -> None:
+            pass
+
+    chunks = [
+        chunk
+        async for chunk in processor.create_response_stream(
+            ctx,
+            live(),
+            _Closable(),
+            _Closable(),
+            [b'data: {"choices": [{"delta": {"content": "hel'],
+            start_time=0.0,
+        )
+    ]
+
+    assert chunks == [
+        b'data: {"choices": [{"delta": {"content": "hel',
+        b'lo"}}]}\n\n',
+        b"data: [DONE]\n\n",
+    ]
+    assert started == [True]
+    assert ctx.first_byte_time_ms is not None
+    assert ctx.collected_text == "hello"
+    assert ctx.has_completion is True
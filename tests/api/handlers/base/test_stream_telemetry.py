@@ -0,0 +1,19 @@
+from src.api.handlers.base.stream_telemetry import StreamTelemetryQueue
+
+
+async def test_stream_telemetry_queue_runs_jobs_and_drains_on_stop() -> None:
+    queue = StreamTelemetryQueue(worker_count=2)
+    done = []
+
+    async def job() -> None:
+        done.append(1)
+
+    assert queue.submit(job) is False
+
+    await queue.start()
+    for _ in range(5):
+        assert queue.submit(job) is True
+    await queue.stop()
+
+    assert len(done) == 5
+    assert queue.submit(job) is False
@@ -0,0 +1,24 @@
+from src.api.handlers.claude.stream_parser import ClaudeStreamBuffer, ClaudeStreamParser
+
+
+def test_feed_parses_events_split_across_chunks() -> None:
+    stream = (
+        b"event: message_start\r\n"
+        b'data: {"type": "message_start", "message": {"id": "msg_1"}}\r\n\r\n'
+        b"event: content_block_delta\n"
+        b'data: {"delta": {"type": "text_delta", "text": "\xe4\xbd\xa0\xe5\xa5\xbd"}}\n\n'
+        b"event: message_stop\n"
+        b'data: {"type": "message_stop"}'
+    )
+    parser = ClaudeStreamParser()
+    buffer = ClaudeStreamBuffer()
+
+    # feed() 立即缓冲并返回列表，不依赖调用方迭代结果
+    results = [buffer.feed(stream[i : i + 7]) for i in range(0, len(stream), 7)]
+    events = [event for result in results for event in result]
+    assert [event["type"] for event in events] == ["message_start", "content_block_delta"]
+    assert parser.extract_text_delta(events[1]) == "你好"
+
+    assert buffer.flush() == [{"type": "message_stop"}]
+    assert buffer.flush() == []
+    assert parser.parse_chunk(stream) == events + [{"type": "message_stop"}]
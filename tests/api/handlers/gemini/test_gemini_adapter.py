@@ -0,0 +1,50 @@
+from src.api.handlers.gemini.adapter import GeminiChatAdapter
+from src.models.gemini import GeminiRequest
+
+
+def test_audit_metadata_counts_roles_including_missing_role() -> None:
+    request = GeminiRequest.model_validate(
+        {
+            "contents": [
+                {"role": "user", "parts": [{"text": "a"}]},
+                {"parts": [{"text": "b"}]},
+                {"role": "model", "parts": [{"text": "c"}]},
+                {"role": "user", "parts": [{"text": "d"}]},
+            ]
+        }
+    )
+
+    metadata = GeminiChatAdapter._build_audit_metadata(None, {}, request)
+
+    assert metadata["contents_count"] == 4
+    assert metadata["content_roles"] == {"user": 2, "unknown": 1, "model": 1}
+
+
+def test_audit_metadata_reads_generation_config_fields() -> None:
+    request = GeminiRequest.model_validate(
+        {
+            "contents": [{"role": "user", "parts": [{"text": "a"}]}],
+            "generationConfig": {"maxOutputTokens": 256, "temperature": 0.5, "topK": 3},
+        }
+    )
+    request.model = "gemini-pro"
+    request.stream = True
+
+    metadata = GeminiChatAdapter._build_audit_metadata(None, {}, request)
+
+    assert metadata["model"] == "gemini-pro"
+    assert metadata["stream"] is True
+
+    assert metadata["max_output_tokens"] == 256
+    assert metadata["temperature"] == 0.5
+    assert metadata["top_p"] is None
+    assert metadata["top_k"] == 3
+
+
+def test_validate_request_body_ignores_client_stream_value() -> None:
+    body = {"contents": [{"role": "user", "parts": [{"text": "a"}]}], "stream": "maybe"}
+
+    request = GeminiChatAdapter()._validate_request_body(body, {"model": "gemini-pro"})
+
+    assert request.stream is False
+    assert "stream" not in request.model_dump()
@@ -0,0 +1,20 @@
+from src.api.handlers.gemini.converter import OpenAIToGeminiConverter
+
+
+def test_openai_messages_with_null_tool_calls_convert() -> None:
+    request = {
+        "model": "gpt-4o",
+        "messages": [
+            {"role": "system", "content": "be brief"},
+            {"role": "user", "content": "hi", "tool_calls": None},
+            {"role": "assistant", "content": "hello", "tool_calls": None},
+        ],
+    }
+
+    gemini_request = OpenAIToGeminiConverter().convert_request(request)
+
+    assert gemini_request["contents"] == [
+        {"role": "user", "parts": [{"text": "hi"}]},
+        {"role": "model", "parts": [{"text": "hello"}]},
+    ]
+    assert gemini_request["system_instruction"] == {"parts": [{"text": "be brief"}]}
@@ -0,0 +1,30 @@
+import json
+
+from src.api.handlers.gemini.stream_parser import GeminiStreamParser
+
+
+def test_parse_chunk_handles_elements_split_across_chunks() -> None:
+    objects = [
+        {"candidates": [{"content": {"parts": [{"text": '你好 {x} [y], "q"'}], "role": "model"}}]},
+        {"usageMetadata": {"totalTokenCount": 3}},
+        {"candidates": [{"finishReason": "STOP", "content": {"parts": [{"text": "end"}]}}]},
+    ]
+    stream = (
+        "[" + ",\r\n".join(json.dumps(obj, ensure_ascii=False) for obj in objects) + "]"
+    ).encode("utf-8")
+    parser = GeminiStreamParser()
+
+    events = []
+    for i in range(0, len(stream), 5):
+        events.extend(parser.parse_chunk(stream[i : i + 5]))
+
+    assert events == objects
+
+
+def test_parse_chunk_ignores_text_outside_array_and_resets() -> None:
+    parser = GeminiStreamParser()
+
+    assert parser.parse_chunk('{"ignored": 1}\n[{"a": 1}') == [{"a": 1}]
+    assert parser.parse_chunk(', {"b": ') == []
+    parser.reset()
+    assert parser.parse_chunk('[{"c": 3}]') == [{"c": 3}]
@@ -0,0 +1,27 @@
+import json
+
+import pytest
+
+from src.utils.json_utils import JSONDecodeError, json_dumps, json_loads
+
+
+def test_json_loads_accepts_str_and_bytes() -> None:
+    assert json_loads('{"a": 1}') == {"a": 1}
+    assert json_loads('{"text": "héllo"}'.encode("utf-8")) == {"text": "héllo"}
+
+
+def test_json_loads_falls_back_for_inputs_orjson_rejects() -> None:
+    data = json_loads('{"v": NaN, "big": 123456789012345678901234567890}')
+    assert data["v"] != data["v"]
+    assert data["big"] == 123456789012345678901234567890
+
+
+def test_json_loads_raises_stdlib_decode_error() -> None:
+    with pytest.raises(JSONDecodeError):
+        json_loads("[DONE]")
+
+
+def test_json_dumps_round_trips_and_falls_back_for_big_ints() -> None:
+    data = {"text": "你好", "n": [1, 2.5, None]}
+    assert json_loads(json_dumps(data)) == data
+    assert json.loads(json_dumps({"big": 10**30})) == {"big": 10**30}
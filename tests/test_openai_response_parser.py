@@ -1,4 +1,5 @@
 from src.api.handlers.base.parsers import OpenAIResponseParser
+from src.api.handlers.base.response_parser import StreamStats
 
 
 def test_extract_usage_from_response_allows_null_usage() -> None:
@@ -45,3 +46,25 @@ def test_parse_response_allows_null_usage() -> None:
     assert parsed.text_content == "hello"
     assert parsed.input_tokens == 0
     assert parsed.output_tokens == 0
+
+
+def test_parse_sse_line_collects_delta_and_detects_finish() -> None:
+    parser = OpenAIResponseParser()
+    stats = StreamStats()
+
+    chunk = parser.parse_sse_line('data: {"choices": [{"delta": {"content": "hi"}}]}', stats)
+    assert chunk is not None
+    assert chunk.text_delta == "hi"
+    assert chunk.is_done is False
+
+    chunk = parser.parse_sse_line(
+        'data: {"choices": [{"delta": {}, "finish_reason": "stop"}]}', stats
+    )
+    assert chunk is not None
+    assert chunk.is_done is True
+
+    assert parser.parse_sse_line("data: [DONE]", stats) is None
+    assert parser.parse_sse_line("  ", stats) is None
+    assert stats.collected_text == "hi"
+    assert stats.has_completion is True
+    assert stats.data_count == 2
@@ -0,0 +1,15 @@
+from fastapi import Request
+
+from src.utils.request_utils import get_bearer_token
+
+
+def _request(authorization: str) -> Request:
+    return Request({"type": "http", "headers": [(b"authorization", authorization.encode())]})
+
+
+def test_get_bearer_token_is_case_insensitive_and_strips() -> None:
+    assert get_bearer_token(_request("Bearer sk-1")) == "sk-1"
+    assert get_bearer_token(_request("bearer  sk-2 ")) == "sk-2"
+    assert get_bearer_token(_request("Bearer ")) is None
+    assert get_bearer_token(_request("Basic abc")) is None
+    assert get_bearer_token(Request({"type": "http", "headers": []})) is None
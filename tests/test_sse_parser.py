@@ -0,0 +1,21 @@
+from src.utils.sse_parser import SSEEventParser
+
+
+def test_feed_line_reuses_event_dict_and_flush_returns_a_copy() -> None:
+    parser = SSEEventParser()
+
+    assert list(parser.feed_line("event: message_start")) == []
+    assert list(parser.feed_line('data: {"a": 1}')) == []
+    (first,) = parser.feed_line("")
+    assert first == {"event": "message_start", "data": '{"a": 1}', "id": None, "retry": None}
+
+    parser.feed_line("data: line1")
+    (second,) = parser.feed_line("data: line2")  # 连续 data 行会先结束上一个事件
+    assert second is first
+    assert second["data"] == "line1"
+    assert second["event"] is None
+
+    (flushed,) = parser.flush()
+    assert flushed is not first
+    assert flushed["data"] == "line2"
+    assert parser.flush() == []